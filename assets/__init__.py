@@ -1,9 +1,10 @@
 '''prepare imports for cleaner imports'''
 from .baseclasses import MenuFrame, SubMenu
 from .cell import AbstractCell, Cell
+from .constants import POLL_INTERVAL
 from .dataclasses import Difficulty, Dimension, Language, MenuPosition
 from .dataclasses import Position2D as Position
-from .dataclasses import Resolution
+from .dataclasses import Renderer, Resolution
 from .dialog import (EndMessage, ErrorMessage, MultiplayerCancelMessage,
                      MultiplayerMessage)
 from .entry_point import EntryPoint
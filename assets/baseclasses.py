@@ -3,7 +3,9 @@ from tkinter import Button, Frame, Label
 from tkinter.font import Font
 from typing import TYPE_CHECKING
 
-from .dataclasses import MenuPosition, Resolution
+from helper.layout_helper import Layout, get_layout
+
+from .dataclasses import MenuPosition
 
 if TYPE_CHECKING:
     from components import MainWindow
@@ -15,21 +17,16 @@ class MenuFrame(Frame):
     def __init__(self, window) -> None:
         super().__init__(master=window)
         self.window: MainWindow = window
-        match self.window.settings.resolution:
-            case Resolution.SMALL.value:
-                self.font: Font = Font(family='Cooper Black',
-                                       size=27)
-                self.small_font: Font = Font(family='Cooper Black',
-                                             size=21)
-            case Resolution.MEDIUM.value:
-                self.font: Font = Font(family='Cooper Black',
-                                       size=37)
-                self.small_font: Font = Font(family='Cooper Black',
-                                             size=31)
-        self.button_height = self.window.settings.resolution.height // 7
-        self.button_width = self.window.settings.resolution.width * 4 // 7
-        self.button_margin_y = self.button_height // 2
-        self.button_margin_x = self.window.settings.resolution.width // 4.6
+        layout: Layout = get_layout(width=self.window.settings.resolution.width,
+                                    height=self.window.settings.resolution.height)
+        self.font: Font = Font(family='Cooper Black',
+                               size=layout.font_size)
+        self.small_font: Font = Font(family='Cooper Black',
+                                     size=layout.small_font_size)
+        self.button_height = layout.button_height
+        self.button_width = layout.button_width
+        self.button_margin_y = layout.button_margin_y
+        self.button_margin_x = layout.button_margin_x
         self._prepare_menu()
 
     def _prepare_menu(self) -> None:
@@ -46,15 +46,13 @@ class Cell(AbstractCell):
                           height=self.height)
 
     def change_state(self, player: int) -> None:
-        '''Changes the rendered image based on player given.'''
+        '''Changes the rendered image based on player given, -1 empties the cell.'''
         match player:
-            case 1:
-                self.widget.configure(image=self.board.frame.window
-                                      .resources.images['cell']['player1'])
-                self.current_player = 1
-            case 2:
-                self.widget.configure(image=self.board.frame.window
-                                      .resources.images['cell']['player2'])
-                self.current_player = 2
+            case -1:
+                image = 'empty'
+            case 1 | 2:
+                image = f'player{player}'
             case _:
                 raise NotImplementedError(f'Player {player} not supported!')
+        self.widget.configure(image=self.board.frame.window.resources.images['cell'][image])
+        self.current_player = player
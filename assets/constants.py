@@ -0,0 +1,4 @@
+'''Constants shared by the ui.'''
+
+# milliseconds between two checks for work done by another thread or process, about one frame
+POLL_INTERVAL = 16
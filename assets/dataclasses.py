@@ -4,6 +4,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 from enum import Enum
 
+# the bot needs the difficulties without tkinter, thus they live in the engine
+from engine import Difficulty  # pylint: disable=unused-import
+
 
 @dataclass()
 class Dimension:
@@ -24,14 +27,6 @@ class Position2D:
                           y=self.y+other.y)
 
 
-class Difficulty(Enum):
-    '''Constants for the difficulties.'''
-    EASY = 0
-    MEDIUM = 1
-    HARD = 2
-    EXTREME = 3
-
-
 class Resolution(Enum):
     '''Constants for the resolutions.'''
     SMALL = Dimension(width=500, height=500)
@@ -44,6 +39,14 @@ class Language(Enum):
     GERMAN = 'de'
 
 
+class Renderer(Enum):
+    '''Constants for the ways a board can be drawn.'''
+    # one label per cell and one button per entry point
+    WIDGETS = 'widgets'
+    # a single canvas for the whole board
+    CANVAS = 'canvas'
+
+
 class MenuPosition(Enum):
     '''Constants for the menu button positions.'''
     TOP = 0
@@ -1,10 +1,11 @@
 '''Any dialog with the user.'''
-from threading import Event, Thread
-from time import sleep
+from threading import Event
 from tkinter import ACTIVE, LEFT, Button, Frame, Label
 from tkinter.simpledialog import Dialog
 from typing import TYPE_CHECKING
 
+from .constants import POLL_INTERVAL
+
 if TYPE_CHECKING:
     from components import GameFrame
     from components.menu import MultiplayerSubMenu
@@ -81,16 +82,17 @@ class MultiplayerMessage(Dialog):
         self.event = event
         self.canceled: bool = False
         self.msg = msg
-        Thread(target=self._check_event, daemon=True).start()
+        # checked by tk's own loop, the dialog must not be closed from another thread
+        self._poll: str = frame.after(POLL_INTERVAL, self._check_event)
         super().__init__(parent=frame, title=title)
 
     def _check_event(self):
-        while not self.canceled:
-            if self.event.is_set():
-                self.canceled = False
-                self.cancel()
-                break
-            sleep(0.1)
+        if self.canceled:
+            return
+        if self.event.is_set():
+            self.cancel()
+            return
+        self._poll = self.frame.after(POLL_INTERVAL, self._check_event)
 
     def buttonbox(self):
         # taken from Dialog and modified for custom language
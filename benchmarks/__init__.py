@@ -0,0 +1,3 @@
+'''prepare imports for cleaner imports'''
+from .corpus import CORPORA, get_corpus
+from .runner import compare_results, run_benchmarks
@@ -0,0 +1,44 @@
+'''Runs the benchmarks: python -m benchmarks'''
+import json
+import sys
+from argparse import ArgumentParser
+
+from .runner import compare_results, run_benchmarks
+
+if __name__ == '__main__':
+    parser = ArgumentParser(prog='python -m benchmarks',
+                            description='Times board helpers and bots on seeded positions.')
+    parser.add_argument('--positions', type=int, default=20,
+                        help='positions per corpus')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='calls per position and benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bot-time', type=float, default=0.05,
+                        help='seconds the perfect bot may think about a move')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='results to compare against, exits with 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='allowed slowdown of the median before it counts as regression')
+    args = parser.parse_args()
+    current = run_benchmarks(positions=args.positions,
+                             repeat=args.repeat,
+                             seed=args.seed,
+                             bot_time=args.bot_time)
+    with open(file=args.output, mode='w', encoding='utf-8') as file_handle:
+        json.dump(current, file_handle, indent=4)
+    print(f'{"benchmark":<50}{"median us":>12}{"p95 us":>12}{"p99 us":>12}{"peak bytes":>12}')
+    for name, result in current['results'].items():
+        print(f'{name:<50}{result["median_us"]:>12.2f}{result["p95_us"]:>12.2f}'
+              f'{result["p99_us"]:>12.2f}{result["peak_bytes"]:>12}')
+    if args.compare:
+        with open(file=args.compare, mode='r', encoding='utf-8') as file_handle:
+            baseline = json.load(file_handle)
+        regressions = compare_results(baseline=baseline,
+                                      current=current,
+                                      threshold=args.threshold)
+        for regression in regressions:
+            print('Regression:', regression)
+        if regressions:
+            sys.exit(1)
+        print('No regressions against', args.compare)
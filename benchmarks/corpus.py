@@ -0,0 +1,55 @@
+'''Seeded positions to benchmark on, the same seed always builds the same positions.'''
+import random
+
+from engine import BitBoard
+
+CORPORA = ('opening', 'midgame', 'near_full', 'won')
+
+
+def get_corpus(name: str, count: int, seed: int = 0) -> list[BitBoard]:
+    '''Builds count positions of the corpus by random play.'''
+    rng = random.Random(f'{name}-{seed}')
+    positions: list[BitBoard] = []
+    while len(positions) < count:
+        state = _get_position(name, rng)
+        if state is not None:
+            positions.append(state)
+    return positions
+
+
+def _get_position(name: str, rng: random.Random) -> BitBoard | None:
+    '''
+    - opening: 2 to 6 coins
+    - midgame: 14 to 24 coins
+    - near_full: at most 6 empty cells
+    - won: the last move connected four
+    Positions of the first three corpora are never over.
+    '''
+    state = BitBoard()
+    match name:
+        case 'opening':
+            target = rng.randint(2, 6)
+        case 'midgame':
+            target = rng.randint(14, 24)
+        case 'near_full':
+            target = state.size - rng.randint(1, 6)
+        case 'won':
+            target = state.size
+        case _:
+            raise NotImplementedError(f'Corpus {name} not supported!')
+    while state.moves < target:
+        move = rng.choice(state.get_possible_moves())
+        if state.is_winning_move(move):
+            if name == 'won':
+                state.play(move)
+                return state
+            safe_moves = [col for col in state.get_possible_moves()
+                          if not state.is_winning_move(col)]
+            if not safe_moves:
+                return None
+            move = rng.choice(safe_moves)
+        state.play(move)
+    if name == 'won':
+        # the board filled up without a winner
+        return None
+    return state
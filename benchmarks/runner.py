@@ -0,0 +1,114 @@
+'''Times the board helpers and bots on the corpora.'''
+import platform
+import random
+import tracemalloc
+from time import perf_counter_ns
+from typing import Callable
+
+from engine import BitBoard, Difficulty, GameState, TranspositionTable
+from helper import board_helper as BoardHelper
+from helper import bot_helper as BotHelper
+from helper.metrics_helper import get_percentile
+
+from .corpus import CORPORA, get_corpus
+
+
+def _measure(function: Callable[[], object], repeat: int) -> tuple[list[int], int]:
+    '''Nanoseconds of each call and the peak of memory allocated by one call in bytes.'''
+    timings = []
+    for _ in range(0, repeat, 1):
+        start = perf_counter_ns()
+        function()
+        timings.append(perf_counter_ns() - start)
+    # tracing slows every allocation down, thus it gets its own call
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, max(0, peak - before)
+
+
+def _get_benchmarks(state: BitBoard, bot_time: float) -> dict[str, Callable[[], object]]:
+    '''Everything to time on one position.'''
+    abstract_board = BoardHelper.get_abstract_board(state)
+    game = GameState()
+    for col in state.history:
+        game.play(col)
+    benchmarks = {
+        'has_connected_four': lambda: BoardHelper.has_connected_four(abstract_board,
+                                                                    state.cols,
+                                                                    state.rows),
+        'get_possible_moves': game.get_possible_moves,
+        'get_abstract_board': lambda: BoardHelper.get_abstract_board(state),
+    }
+    if game.is_over():
+        return benchmarks
+
+    def calculate(difficulty: Difficulty) -> Callable[[], int]:
+        def calculate_next_move() -> int:
+            # same random choices and an empty table for every call
+            random.seed(0)
+            transpositions = None
+            if difficulty == Difficulty.PERFECT:
+                transpositions = TranspositionTable(max_memory=64 * 1024)
+            return BotHelper.calculate_next_move(difficulty=difficulty.value,
+                                                 state=state,
+                                                 time_budget=bot_time,
+                                                 transpositions=transpositions)
+        return calculate_next_move
+
+    for difficulty in Difficulty:
+        benchmarks[f'calculate_next_move[{difficulty.name.lower()}]'] = calculate(difficulty)
+    return benchmarks
+
+
+def run_benchmarks(positions: int = 20, repeat: int = 5, seed: int = 0,
+                   bot_time: float = 0.05) -> dict:
+    '''
+    Times every benchmark on every corpus.
+    Results contain median, p95 and p99 in microseconds and the peak allocation in bytes.
+    '''
+    results: dict[str, dict] = {}
+    for corpus in CORPORA:
+        samples: dict[str, list[int]] = {}
+        allocations: dict[str, list[int]] = {}
+        for state in get_corpus(name=corpus, count=positions, seed=seed):
+            for name, function in _get_benchmarks(state, bot_time).items():
+                timings, peak = _measure(function, repeat)
+                samples.setdefault(name, []).extend(timings)
+                allocations.setdefault(name, []).append(peak)
+        for name, timings in samples.items():
+            results[f'{corpus}/{name}'] = {
+                'runs': len(timings),
+                'median_us': get_percentile(timings, 0.5) / 1000,
+                'p95_us': get_percentile(timings, 0.95) / 1000,
+                'p99_us': get_percentile(timings, 0.99) / 1000,
+                'peak_bytes': get_percentile(allocations[name], 0.5)
+            }
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'positions': positions,
+            'repeat': repeat,
+            'seed': seed,
+            'bot_time': bot_time
+        },
+        'results': results
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.1) -> list[str]:
+    '''Every benchmark whose median got slower than the threshold allows.'''
+    regressions = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        old_median = baseline['results'][name]['median_us']
+        new_median = result['median_us']
+        if old_median > 0 and new_median > old_median * (1 + threshold):
+            regressions.append(f'{name}: {old_median:.2f} us -> {new_median:.2f} us '
+                               f'(+{new_median / old_median - 1:.0%})')
+    return regressions
@@ -0,0 +1,20 @@
+'''Builds the opening book for the perfect bot.'''
+from argparse import ArgumentParser
+
+from engine import BOOK_DEPTH, BOOK_PLIES, build_opening_book, get_book_path
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Searches all early positions and writes them to res/book.')
+    parser.add_argument('--cols', type=int, default=7)
+    parser.add_argument('--rows', type=int, default=6)
+    parser.add_argument('--plies', type=int, default=BOOK_PLIES,
+                        help='positions with up to this many coins are stored')
+    parser.add_argument('--depth', type=int, default=BOOK_DEPTH,
+                        help='search depth for every position')
+    args = parser.parse_args()
+    count = build_opening_book(cols=args.cols,
+                               rows=args.rows,
+                               plies=args.plies,
+                               depth=args.depth)
+    print(f'Stored {count} positions in',
+          get_book_path(cols=args.cols, rows=args.rows))
@@ -0,0 +1,95 @@
+'''Animations driven by after(), one callback per frame runs all of them.'''
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Hashable
+
+if TYPE_CHECKING:
+    from components import MainWindow
+
+# frames per second animations aim for
+FRAME_RATE = 60
+
+
+@dataclass
+class Animation:
+    '''step is called with the progress from 0 to 1, on_done once after the last step.'''
+    started: float
+    duration: float
+    step: Callable[[float], None]
+    on_done: Callable[[], None] = None
+
+
+class Animator:
+    '''
+    Runs all animations with a single after() per frame.
+    - progress is taken from the time since the start, thus a late frame simply skips ahead
+    - each key runs one animation, starting another one finishes the previous first
+    - a frame only configures widgets, tk draws them once idle, input is never blocked meanwhile
+    - the time between two frames goes to animation_frame_seconds, frames skipped to
+      animation_skipped_frames
+    Nothing is scheduled while no animation runs.
+    '''
+
+    def __init__(self, window, frame_rate: int = FRAME_RATE) -> None:
+        self.window: MainWindow = window
+        self.frame_time: float = 1 / frame_rate
+        self._animations: dict[Hashable, Animation] = {}
+        self._scheduled: str = None
+        self._last_frame: float = None
+
+    def animate(self, key: Hashable, duration: float, step: Callable[[float], None],
+                on_done: Callable[[], None] = None) -> None:
+        '''Starts an animation, the first step is drawn with the next frame.'''
+        self.finish(key)
+        self._animations[key] = Animation(started=perf_counter(),
+                                          duration=duration,
+                                          step=step,
+                                          on_done=on_done)
+        if self._scheduled is None:
+            self._last_frame = perf_counter()
+            self._scheduled = self.window.after(round(self.frame_time * 1000), self._run_frame)
+
+    def is_running(self, key: Hashable) -> bool:
+        '''True while the animation of the key has not finished.'''
+        return key in self._animations
+
+    def finish(self, key: Hashable) -> None:
+        '''Jumps to the end of the animation of the key, if any.'''
+        animation = self._animations.pop(key, None)
+        if animation:
+            self._end(animation)
+
+    def cancel(self, key: Hashable) -> None:
+        '''Drops the animation of the key without drawing its end, e.g. its widgets are gone.'''
+        self._animations.pop(key, None)
+
+    def _end(self, animation: Animation) -> None:
+        animation.step(1.0)
+        if animation.on_done:
+            animation.on_done()
+
+    def _run_frame(self) -> None:
+        now = perf_counter()
+        elapsed = now - self._last_frame
+        self._last_frame = now
+        self.window.metrics.histogram('animation_frame_seconds').observe(elapsed)
+        skipped = round(elapsed / self.frame_time) - 1
+        if skipped > 0:
+            self.window.metrics.counter('animation_skipped_frames').inc(skipped)
+        # coalesced, every animation draws its state of this frame once
+        for key, animation in list(self._animations.items()):
+            if self._animations.get(key) is not animation:
+                # finished or replaced by a step of another animation
+                continue
+            progress = (now - animation.started) / animation.duration
+            if progress < 1.0:
+                animation.step(progress)
+            else:
+                del self._animations[key]
+                self._end(animation)
+        if not self._animations:
+            self._scheduled = None
+            return
+        # keep the rate, less the time this frame took
+        delay = self.frame_time - (perf_counter() - now)
+        self._scheduled = self.window.after(max(1, round(delay * 1000)), self._run_frame)
@@ -1,29 +1,54 @@
 '''component class for managing the board.'''
-from typing import TYPE_CHECKING
+from tkinter import Canvas
+from typing import TYPE_CHECKING, Callable
 
 from assets import AbstractCell, Cell, EntryPoint, Position
+from engine import BitBoard, GameState, Move
 from helper import board_helper as BoardHelper
 
 if TYPE_CHECKING:
     from components import GameFrame
 
+# seconds a coin falls through a whole col, it speeds up on its way like a real one
+DROP_TIME = 0.35
+# seconds the winning coins blink and how often
+WIN_TIME = 1.2
+WIN_BLINKS = 3
+
 
 class Board:
-    '''Board component for the connect four game.'''
+    '''
+    Board component for the connect four game.
+    The game state is the source of truth, the board only renders it.
+    on_click is called with the col the player dropped a coin into.
+    Coins fall into their cell and the winning ones blink, the game does not wait for that.
+    '''
 
-    def __init__(self, frame) -> None:
+    def __init__(self, frame, game: GameState, on_click: Callable[[int], None]) -> None:
         self.frame: GameFrame = frame
-        self.rows = 6
-        self.cols = 7
+        self.game: GameState = game
+        self.rows = game.rows
+        self.cols = game.cols
         self.entry_points: dict[int, EntryPoint] = {}
         self.cells: dict[Position, Cell] = {}
-        self._prepare_board()
+        self._prepare_board(on_click)
+        self.game.subscribe(self._render_move)
+
+    @property
+    def state(self) -> BitBoard:
+        '''Bitboard of the rendered game.'''
+        return self.game.board
 
-    def _prepare_board(self) -> None:
+    def _prepare_board(self, on_click: Callable[[int], None]) -> None:
         '''Creates an empty board by placing all necessary widgets.'''
         for col_index in range(0, self.cols, 1):
             entry_point = EntryPoint(board=self,
                                      col_index=col_index)
+            entry_point.widget.configure(command=lambda i=col_index: on_click(i))
+            entry_point.widget.bind("<Enter>", lambda _, entry=entry_point:
+                                    self._hover(entry, self.game.current_player))
+            entry_point.widget.bind("<Leave>", lambda _, entry=entry_point:
+                                    self._hover(entry, -1))
             self.entry_points.update({col_index: entry_point})
             for row_index in range(0, self.rows, 1):
                 cell = Cell(board=self,
@@ -31,17 +56,188 @@ class Board:
                             row_index=row_index)
                 self.cells.update({Position(x=col_index, y=row_index): cell})
 
+    def _hover(self, entry_point: EntryPoint, player: int) -> None:
+        '''Disabled entry points belong to a finished game or to spectators.'''
+        if entry_point.widget.cget('state') != 'disabled':
+            entry_point.change_state(player)
+
+    def enable(self, enabled: bool) -> None:
+        '''Coins can only be dropped while enabled.'''
+        for entry_point in self.entry_points.values():
+            entry_point.widget.configure(state='normal' if enabled else 'disabled')
+
+    def clear_hover(self, col_index: int) -> None:
+        '''Removes the coin shown above the col.'''
+        self.entry_points[col_index].change_state(-1)
+
+    def reset(self) -> None:
+        '''Empties the board for the next game of its game state, the widgets stay.'''
+        self._finish_animations()
+        for cell in self.cells.values():
+            if not cell.is_empty():
+                cell.change_state(-1)
+        for entry_point in self.entry_points.values():
+            entry_point.change_state(-1)
+
+    def _render_move(self, move: Move) -> None:
+        '''Mirrors an applied move on its cell, the coin falls in from the top.'''
+        ply = self.game.board.moves
+        # falling takes the square root of the distance
+        duration = DROP_TIME * ((move.row + 1) / self.rows) ** 0.5
+        self.frame.window.animator.animate(key=(self, move.col),
+                                           duration=duration,
+                                           step=lambda progress: self._drop(move, progress),
+                                           on_done=lambda: self._dropped(ply))
+
+    def _drop(self, move: Move, progress: float) -> None:
+        '''Shows the coin in the cell it is falling through, all cells above are empty.'''
+        row_index = min(int(progress ** 2 * (move.row + 1)), move.row)
+        for index in range(0, move.row + 1, 1):
+            self._show_cell(move.col, index, move.player if index == row_index else -1)
+
+    def _show_cell(self, col_index: int, row_index: int, player: int) -> None:
+        cell = self.cells[Position(x=col_index, y=row_index)]
+        if cell.current_player != player:
+            cell.change_state(player)
+
+    def _dropped(self, ply: int) -> None:
+        '''Lets the winning coins blink once the last coin arrived.'''
+        if ply != self.game.board.moves or self.game.winner == -1:
+            return
+        cells = self.game.get_winning_cells()
+        self.frame.window.animator.animate(key=(self, 'win'),
+                                           duration=WIN_TIME,
+                                           step=lambda progress: self._blink(cells, progress))
+
+    def _blink(self, cells: list[tuple[int, int]], progress: float) -> None:
+        visible = progress >= 1.0 or int(progress * WIN_BLINKS * 2) % 2 == 0
+        for col_index, row_index in cells:
+            self._show_cell(col_index, row_index, self.game.winner if visible else -1)
+
+    def _finish_animations(self) -> None:
+        for key in [*range(0, self.cols, 1), 'win']:
+            self.frame.window.animator.finish((self, key))
+
+    def cancel_animations(self) -> None:
+        '''Stops all animations without drawing their end, e.g. before the board is destroyed.'''
+        for key in [*range(0, self.cols, 1), 'win']:
+            self.frame.window.animator.cancel((self, key))
+
     def get_abstract_board(self) -> dict[Position, AbstractCell]:
         '''Converts the current board's state to an abstract board for computation.'''
-        abstract_board: dict[Position, AbstractCell] = {}
-        for pos, cell in self.cells.items():
-            abstract_cell = AbstractCell(col_index=cell.col_index,
-                                         row_index=cell.row_index)
-            abstract_cell.current_player = cell.current_player
-            abstract_board.update({pos: abstract_cell})
-        return abstract_board
+        return BoardHelper.get_abstract_board(self.state)
 
     def get_possible_moves(self) -> list[int]:
         '''This prevents coin_dropped = False for the bot.'''
-        return [col for col in range(0, self.cols, 1)
-                if BoardHelper.has_empty_cell(BoardHelper.get_cells_in_col(self.cells, col))]
+        return self.game.get_possible_moves()
+
+
+class CanvasBoard(Board):
+    '''
+    Draws the whole board on a single canvas instead of a widget per cell and entry point.
+    - every cell and entry point is an image item tagged by its position (cell3x5, entry3)
+    - only items whose image changes are configured, tk then redraws just their area
+    - the col under the mouse is its x divided by the cell size, anywhere in the col counts
+    '''
+
+    def __init__(self, frame, game: GameState, on_click: Callable[[int], None]) -> None:
+        self.size: int = frame.window.settings.resolution.width // game.cols
+        self.canvas: Canvas = None
+        self.enabled: bool = True
+        # image each item shows, to skip configuring items that stay the same
+        self._drawn: dict[str, str] = {}
+        self._hovered: int = -1
+        super().__init__(frame=frame, game=game, on_click=on_click)
+
+    def _prepare_board(self, on_click: Callable[[int], None]) -> None:
+        '''Creates the canvas with an empty image item per cell and entry point.'''
+        self.canvas = Canvas(master=self.frame,
+                             highlightthickness=0,
+                             borderwidth=0)
+        self.canvas.place(x=0, y=0,
+                          width=self.size * self.cols,
+                          height=self.size * (self.rows + 1))
+        for col_index in range(0, self.cols, 1):
+            self._create_item(f'entry{col_index}', col_index, 0)
+            for row_index in range(0, self.rows, 1):
+                # +1 because of the entry points above
+                self._create_item(f'cell{col_index}x{row_index}', col_index, row_index + 1)
+        self.canvas.bind('<Motion>', lambda event: self._hover_col(self._get_col(event.x)))
+        self.canvas.bind('<Leave>', lambda _: self._hover_col(-1))
+        self.canvas.bind('<ButtonRelease-1>', lambda event: self._click(self._get_col(event.x),
+                                                                        on_click))
+
+    def _create_item(self, tag: str, col_index: int, row_index: int) -> None:
+        self.canvas.create_image(col_index * self.size, row_index * self.size,
+                                 image=self._get_image(tag, 'empty'),
+                                 anchor='nw',
+                                 tags=(tag,))
+        self._drawn[tag] = 'empty'
+
+    def _get_image(self, tag: str, image: str):
+        group = 'entry' if tag.startswith('entry') else 'cell'
+        return self.frame.window.resources.images[group][image]
+
+    def _draw(self, tag: str, image: str) -> None:
+        '''Configures the item only if it shows another image.'''
+        if self._drawn[tag] != image:
+            self.canvas.itemconfigure(tag, image=self._get_image(tag, image))
+            self._drawn[tag] = image
+
+    def _get_col(self, x: int) -> int:
+        col_index = x // self.size
+        return col_index if 0 <= col_index < self.cols else -1
+
+    def _hover_col(self, col_index: int) -> None:
+        '''Shows the coin of the player to move above the col, -1 shows none.'''
+        if not self.enabled:
+            col_index = -1
+        if col_index == self._hovered:
+            return
+        if self._hovered != -1:
+            self._draw(f'entry{self._hovered}', 'empty')
+        if col_index != -1:
+            self._draw(f'entry{col_index}', f'player{self.game.current_player}')
+        self._hovered = col_index
+
+    def _click(self, col_index: int, on_click: Callable[[int], None]) -> None:
+        if self.enabled and col_index != -1:
+            on_click(col_index)
+
+    def enable(self, enabled: bool) -> None:
+        '''Coins can only be dropped while enabled.'''
+        self.enabled = enabled
+        if not enabled:
+            self._hover_col(-1)
+
+    def clear_hover(self, col_index: int) -> None:
+        '''Removes the coin shown above the col, the next mouse motion shows it again.'''
+        self._hover_col(-1)
+
+    def reset(self) -> None:
+        '''Empties all cells that hold a coin.'''
+        self._finish_animations()
+        self._hover_col(-1)
+        for tag, image in self._drawn.items():
+            if image != 'empty':
+                self.canvas.itemconfigure(tag, image=self._get_image(tag, 'empty'))
+                self._drawn[tag] = 'empty'
+
+    def _drop(self, move: Move, progress: float) -> None:
+        '''The falling coin is an item of its own that moves down smoothly.'''
+        tag = f'falling{move.col}'
+        if progress >= 1.0:
+            self.canvas.delete(tag)
+            self._show_cell(move.col, move.row, move.player)
+            return
+        y = round(progress ** 2 * (move.row + 1) * self.size)
+        if self.canvas.find_withtag(tag):
+            self.canvas.coords(tag, move.col * self.size, y)
+        else:
+            self.canvas.create_image(move.col * self.size, y,
+                                     image=self._get_image('cell', f'player{move.player}'),
+                                     anchor='nw',
+                                     tags=(tag,))
+
+    def _show_cell(self, col_index: int, row_index: int, player: int) -> None:
+        self._draw(f'cell{col_index}x{row_index}', 'empty' if player == -1 else f'player{player}')
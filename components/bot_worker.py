@@ -0,0 +1,88 @@
+'''Runs the bot outside of the Tk main loop.'''
+from queue import Empty, Queue
+from threading import Event, Thread
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable
+
+from assets import POLL_INTERVAL
+from engine import (BitBoard, Difficulty, SearchPool, TranspositionTable,
+                    get_search_pool)
+from helper import bot_helper as BotHelper
+
+if TYPE_CHECKING:
+    from components import GameFrame
+
+
+class BotWorker:
+    '''
+    Calculates the bot's moves in a background thread.
+    The result is picked up by polling with after(), thus the frame keeps rendering.
+    '''
+
+    def __init__(self, frame) -> None:
+        self.frame: GameFrame = frame
+        self.transpositions: TranspositionTable = TranspositionTable(
+            max_memory=self.frame.window.settings.bot_memory * 1024 * 1024)
+        self.pool: SearchPool = None
+        if self.frame.window.settings.bot_workers != 1:
+            self.pool = get_search_pool(self.frame.window.settings.bot_workers)
+        self._stop_event: Event = None
+        self._moves: Queue = None
+        self._poll: str = None
+
+    def is_running(self) -> bool:
+        '''True while a move is calculated.'''
+        return self._moves is not None
+
+    def start(self, state: BitBoard, on_move: Callable[[int], None]) -> None:
+        '''Starts calculating a move for the given state, on_move is called with the result.'''
+        self.cancel()
+        self._stop_event = Event()
+        self._moves = Queue(maxsize=1)
+        Thread(target=self._calculate_move,
+               args=[state.copy(), self._stop_event, self._moves,
+                     self.frame.difficulty, self.frame.window.settings.bot_time],
+               daemon=True).start()
+        self._poll = self.frame.after(POLL_INTERVAL, self._poll_move, on_move)
+
+    def _calculate_move(self, state: BitBoard, stop_event: Event, queue: Queue,  # pylint: disable=too-many-arguments
+                        difficulty: int, time_budget: float) -> None:
+        '''Runs in the background thread, must not touch any widget.'''
+        start = perf_counter()
+        move = BotHelper.calculate_next_move(difficulty=difficulty,
+                                             state=state,
+                                             time_budget=time_budget,
+                                             transpositions=self.transpositions,
+                                             stop_event=stop_event,
+                                             pool=self.pool,
+                                             metrics=self.frame.window.metrics)
+        queue.put((move, perf_counter()-start))
+
+    def _poll_move(self, on_move: Callable[[int], None]) -> None:
+        try:
+            move, duration = self._moves.get_nowait()
+        except Empty:
+            self._poll = self.frame.after(POLL_INTERVAL, self._poll_move, on_move)
+            return
+        difficulty = Difficulty(self.frame.difficulty)
+        self.frame.window.metrics.histogram(
+            f'bot_move_seconds[{difficulty.name.lower()}]').observe(duration)
+        self._stop_event = None
+        self._moves = None
+        self._poll = None
+        on_move(move)
+
+    def cancel(self) -> None:
+        '''Stops the background thread and ignores its result.'''
+        if self._stop_event:
+            self._stop_event.set()
+        if self._poll:
+            self.frame.after_cancel(self._poll)
+        self._stop_event = None
+        self._moves = None
+        self._poll = None
+
+    def new_game(self) -> None:
+        '''Positions are only reused within the same game.'''
+        self.cancel()
+        self.transpositions.clear()
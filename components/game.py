@@ -1,25 +1,27 @@
 '''Contains the games that can be played.'''
 from time import perf_counter
-from tkinter import Frame
+from tkinter import Frame, Label
 from typing import TYPE_CHECKING
 
-from assets import Cell, EndMessage
-from helper import board_helper as BoardHelper
-from helper import bot_helper as BotHelper
+from assets import EndMessage, ErrorMessage, Renderer
+from engine import GameState
+from helper.protocol_helper import Message, MessageType
 
-from .board import Board
+from .board import Board, CanvasBoard
+from .bot_worker import BotWorker
 from .network import Communication
 
 if TYPE_CHECKING:
     from components import MainWindow
 
 
-class GameFrame(Frame):
+class GameFrame(Frame):  # pylint: disable=too-many-instance-attributes
     '''Provides a game frame with a connect four board.'''
 
     def __init__(self, window, solo: bool, difficulty: int = 0,
                  communication: Communication = None) -> None:
         super().__init__(master=window)
+        self.game: GameState = None
         self.board: Board = None
         self.solo: bool = solo
         self.difficulty: int = difficulty
@@ -27,25 +29,68 @@ class GameFrame(Frame):
         self.window: MainWindow = window
         self.current_player: int = 1
         self.player_turn: bool = True
+        self.bot: BotWorker = BotWorker(frame=self) if solo else None
+        self.waiting: bool = False
+        self.status = Label(master=self, background='pale turquoise')
+        if communication:
+            communication.listen(on_move=self._opponent_moved,
+                                 on_status=self._connection_changed)
 
     def new_game(self) -> None:
-        '''Sets up a new game.'''
-        self.board = Board(frame=self)
-        for index, entry_point in self.board.entry_points.items():
-            entry_point.widget.configure(state='normal')
-            entry_point.widget.configure(command=lambda i=index:
-                                         self.make_move(i))
-            entry_point.widget.bind("<Enter>", lambda _, entry=entry_point:
-                                    entry.change_state(self.current_player))
-            entry_point.widget.bind("<Leave>", lambda _, entry=entry_point:
-                                    entry.change_state(-1))
-
-    def _drop_coin(self, cells: list[Cell]) -> bool:
-        for cell in cells:
-            if cell.is_empty():
-                cell.change_state(self.current_player)
-                return True
-        return False
+        '''Sets up a new game, the hosting game always starts a network game.'''
+        if self.bot:
+            self.bot.new_game()
+        self.current_player = 1
+        self.player_turn = not self.com or self.com.hosting
+        self.waiting = False
+        self._hide_status()
+        renderer = self.window.settings.renderer
+        started = perf_counter()
+        if self.board is None:
+            self._prepare_board()
+            self.window.metrics.histogram(f'board_prepare_seconds[{renderer}]').observe(
+                perf_counter() - started)
+        else:
+            # every game reuses the widgets of the first one
+            self.game.reset()
+            self.board.reset()
+            self.window.metrics.histogram(f'board_reset_seconds[{renderer}]').observe(
+                perf_counter() - started)
+        self.board.enable(True)
+        if self.com and not self.player_turn:
+            self.wait_for_opponent()
+
+    def _prepare_board(self) -> None:
+        '''Creates the board once with the renderer chosen in the settings.'''
+        self.game = GameState()
+        board = CanvasBoard if self.window.settings.renderer == Renderer.CANVAS.value else Board
+        self.board = board(frame=self, game=self.game, on_click=self._entry_clicked)
+
+    def destroy(self) -> None:
+        '''Stops a running bot calculation or connection as nobody is waiting for it anymore.'''
+        if self.bot:
+            self.bot.cancel()
+        if self.com:
+            self.com.close()
+        if self.board:
+            self.board.cancel_animations()
+        super().destroy()
+
+    def _entry_clicked(self, col_index: int) -> None:
+        '''Clicks only count while nobody else is about to move.'''
+        if not self.waiting:
+            self.make_move(col_index)
+
+    def _show_status(self, text: str) -> None:
+        '''Shows a banner in place of the entry points.'''
+        self.status.configure(text=text)
+        self.status.place(x=0, y=0,
+                          width=self.window.settings.resolution.width,
+                          height=self.window.settings.resolution.width // self.board.cols)
+        self.status.lift()
+
+    def _hide_status(self) -> None:
+        self.status.place_forget()
 
     def _change_turns(self) -> None:
         self.player_turn = not self.player_turn
@@ -57,48 +102,131 @@ class GameFrame(Frame):
         Only affects the board if the move is possible.
         Checks win conditions and calculates/retrieves moves from bot/network.
         '''
-        affected_cells = BoardHelper.get_cells_in_col(self.board.cells,
-                                                      col_index)
-        # start at the bottom of the board
-        affected_cells.reverse()
-        if not self._drop_coin(affected_cells):
+        if not self.game.play(col_index):
             # skip win conditions if nothing happened, also do not swap current player!
             return None
-        self.board.entry_points[col_index].change_state(-1)
+        self.board.clear_hover(col_index)
         if self.com and self.player_turn:
-            self.com.send_move(col_index)
-        if BoardHelper.board_is_full(self.board.cells):
-            return self._end_game(remis=True)
-        if BoardHelper.has_connected_four(board_cells=self.board.cells,
-                                          cols=self.board.cols,
-                                          rows=self.board.rows):
-            return self._end_game(remis=False)
+            self.com.send_move(col_index, ply=self.game.board.moves - 1)
+        if self.game.is_over():
+            return self._end_game(remis=self.game.is_draw())
         self._change_turns()
         if self.com and not self.player_turn:
-            self.window.update()
-            return self.make_move(self.com.get_move())
+            return self.wait_for_opponent()
         if self.solo and not self.player_turn:
-            start = perf_counter()
-            possible_moves = self.board.get_possible_moves()
-            move = BotHelper.calculate_next_move(difficulty=self.difficulty,
-                                                 board=self.board,
-                                                 possible_moves=possible_moves)
-            print('Computer move calculated in:', perf_counter()-start)
-            return self.make_move(move)
+            return self._start_bot_move()
         return None
 
+    def _start_bot_move(self) -> None:
+        '''The bot thinks in the background, the board keeps rendering meanwhile.'''
+        self.waiting = True
+        self._show_status(self.window.translation.get('thinking'))
+        # render the player's coin before the bot takes the cpu
+        self.update_idletasks()
+        self.bot.start(state=self.game.board,
+                       on_move=self._bot_moved)
+
+    def _bot_moved(self, move: int) -> None:
+        self.waiting = False
+        self._hide_status()
+        self.make_move(move)
+
+    def wait_for_opponent(self) -> None:
+        '''
+        Returns right away, the move arrives in _opponent_moved.
+        Meanwhile the board keeps rendering but ignores clicks,
+        no dialog waits and the stack does not grow with every move.
+        '''
+        self.waiting = True
+        self._show_status(self.window.translation.get('multiplayer_get_move_msg'))
+        if self.com.has_move():
+            # arrived before this game was ready for it
+            self.after_idle(self._opponent_moved)
+
+    def _opponent_moved(self) -> None:
+        '''Moves stay queued while it is not the opponent's turn, e.g. before a replay.'''
+        if not self.waiting or not self.com.has_move():
+            return
+        self.waiting = False
+        self._hide_status()
+        self.make_move(self.com.next_move())
+
+    def _connection_changed(self, status: str | None) -> None:
+        if self.game is None:
+            # still connecting, the connect dialog handles it
+            return
+        if status == 'connection_lost':
+            if not self.game.is_over():
+                # otherwise the end message is open, _end_game leaves after it
+                self._leave_game()
+        elif status:
+            self._show_status(self.window.translation.get(status))
+        elif self.waiting:
+            self._show_status(self.window.translation.get('multiplayer_get_move_msg'))
+        else:
+            self._hide_status()
+
+    def _leave_game(self) -> None:
+        '''The other game is gone for good, back to the menu.'''
+        ErrorMessage(frame=self,
+                     title=self.window.translation.get('connection_lost'),
+                     msg=self.window.translation.get('connection_lost_msg'))
+        self.window.show_main_menu()
+
     def _end_game(self, remis: bool) -> None:
         '''Stops interactivity and asks for a new game.'''
-        for _, entry_point in self.board.entry_points.items():
-            entry_point.widget.configure(state='disabled')
-            entry_point.widget.unbind("<Enter>")
-            entry_point.widget.unbind("<Leave>")
+        self.board.enable(False)
         title = self.window.translation.get('end_title')
         end_message = EndMessage(frame=self,
                                  title=title,
                                  remis=remis)
-        if end_message.replay:
-            self.current_player = 1
+        if end_message.replay and self.com and not self.com.connected:
+            self._leave_game()
+        elif end_message.replay:
             self.new_game()
         else:
             self.window.show_main_menu()
+
+
+class SpectatorFrame(GameFrame):
+    '''Shows a game hosted by someone else, the moves of both players arrive over the network.'''
+
+    def __init__(self, window, communication: Communication) -> None:
+        super().__init__(window=window, solo=False, communication=communication)
+        self.new_game()
+
+    def wait_for_opponent(self) -> None:
+        '''Spectators only see moves, they never wait for one.'''
+
+    def _connection_changed(self, status: str | None) -> None:
+        '''Spectators do not reconnect, they only learn when the game is gone.'''
+        if status == 'connection_lost':
+            self._leave_game()
+
+    def watch(self, ip: str, port: int = None) -> bool:
+        '''Connects to the game hosted on the ip, False if that failed or was canceled.'''
+        return self.com.watched_game(ip, on_watch=self._watch, port=port)
+
+    def new_game(self) -> None:
+        '''Sets up an empty board nobody can drop coins into.'''
+        super().new_game()
+        self.board.enable(False)
+        self._show_status(self.window.translation.get('watching'))
+
+    def _watch(self, message: Message) -> None:
+        '''A SYNC replaces the whole game, a MOVE with ply 0 starts the next one.'''
+        if message.type == MessageType.SYNC:
+            self.new_game()
+            moves = message.values[3:]
+        else:
+            col, ply = message.values
+            if ply == 0 and self.game.board.moves:
+                self.new_game()
+            moves = (col,)
+        for col in moves:
+            self.game.play(col)
+        if self.game.is_draw():
+            self._show_status(self.window.translation.get('spectate_draw'))
+        elif self.game.is_over():
+            player = self.window.translation.get(f'player{self.game.winner}')
+            self._show_status(player + self.window.translation.get('spectate_won'))
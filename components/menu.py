@@ -1,8 +1,17 @@
 '''contains all menu components.'''
-from tkinter import Button, Entry
+from tkinter import Button, Entry, Listbox
+from tkinter.font import Font
 
-from assets import (Difficulty, Language, MenuFrame, MenuPosition, Resolution,
-                    SubMenu, ErrorMessage)
+from assets import (Difficulty, Dimension, Language, MenuFrame, MenuPosition,
+                    Resolution, SubMenu, ErrorMessage)
+from helper.discovery_helper import DiscoveredGame
+
+from .network import GameFinder
+
+# milliseconds between two updates of the games found on the network
+LAN_REFRESH = 500
+# share of the screen a window fitted to it takes
+SCREEN_SHARE = 0.85
 
 
 class MainMenu(MenuFrame):
@@ -109,26 +118,27 @@ class DifficultyMenu(SubMenu):
                          text=self.window.translation.get('extreme'),
                          command=lambda: self._change_difficulty(Difficulty.EXTREME))
         self.difficulty_buttons.update({Difficulty.EXTREME.name: extreme})
+        perfect = Button(master=self.window,
+                         text=self.window.translation.get('perfect'),
+                         command=lambda: self._change_difficulty(Difficulty.PERFECT))
+        self.difficulty_buttons.update({Difficulty.PERFECT.name: perfect})
 
     def _configure_difficulty_buttons(self) -> None:
-        for index, button in enumerate(list(self.difficulty_buttons.values())):
+        buttons = list(self.difficulty_buttons.values())
+        for index, button in enumerate(buttons):
             self._configure_menu_button(button=button,
                                         font=self.small_font,
                                         text=button['text'])
-            if index % 2 == 0:
-                top = 0 if index == 0 else 1
-                button.place(x=self.button_margin_x,
-                             y=(top + 1) * self.button_margin_y +
-                             top * self.button_height,
-                             width=self.button_width//2,
-                             height=self.button_height)
-            else:
-                top = 0 if index == 1 else 1
-                button.place(x=self.button_margin_x+self.button_width//2,
-                             y=(top + 1) * self.button_margin_y +
-                             top * self.button_height,
-                             width=self.button_width//2,
-                             height=self.button_height)
+            # two buttons per row, a single button in the last row takes the whole width
+            top = index // 2
+            width = self.button_width//2
+            if index % 2 == 0 and index == len(buttons) - 1:
+                width = self.button_width
+            button.place(x=self.button_margin_x + (index % 2) * self.button_width//2,
+                         y=(top + 1) * self.button_margin_y +
+                         top * self.button_height,
+                         width=width,
+                         height=self.button_height)
         self._set_difficulty_button()
 
     def _change_difficulty(self, difficulty: Difficulty) -> None:
@@ -149,6 +159,8 @@ class DifficultyMenu(SubMenu):
                 self._change_difficulty(Difficulty.HARD)
             case Difficulty.EXTREME.value:
                 self._change_difficulty(Difficulty.EXTREME)
+            case Difficulty.PERFECT.value:
+                self._change_difficulty(Difficulty.PERFECT)
 
 
 class ResolutionMenu(SubMenu):
@@ -162,7 +174,7 @@ class ResolutionMenu(SubMenu):
 
     def _prepare_resolution_menu(self) -> None:
         small = Button(master=self.window,
-                       command=lambda: self._change_resolution(Resolution.SMALL))
+                       command=lambda: self._change_resolution(Resolution.SMALL.value))
         small_text = self.window.translation.get('small_res')
         self._configure_menu_button(button=small,
                                     font=self.font,
@@ -171,7 +183,7 @@ class ResolutionMenu(SubMenu):
                                 position=MenuPosition.TOP)
         self.resolution_buttons.update({Resolution.SMALL.name: small})
         medium = Button(master=self.window,
-                        command=lambda: self._change_resolution(Resolution.MEDIUM))
+                        command=lambda: self._change_resolution(Resolution.MEDIUM.value))
         medium_text = self.window.translation.get('medium_res')
         self._configure_menu_button(button=medium,
                                     font=self.font,
@@ -179,9 +191,26 @@ class ResolutionMenu(SubMenu):
         self._place_menu_button(button=medium,
                                 position=MenuPosition.MIDDLE)
         self.resolution_buttons.update({Resolution.MEDIUM.name: medium})
-
-    def _change_resolution(self, resolution: Resolution) -> None:
-        self.window.set_resolution(resolution.value)
+        screen = Button(master=self.window,
+                        command=lambda: self._change_resolution(self._get_screen_dimension()))
+        screen_text = self.window.translation.get('screen_res')
+        self._configure_menu_button(button=screen,
+                                    font=self.font,
+                                    text=screen_text)
+        self._place_menu_button(button=screen,
+                                position=MenuPosition.BOTTOM)
+        self.resolution_buttons.update({'SCREEN': screen})
+
+    def _get_screen_dimension(self) -> Dimension:
+        '''The largest square fitting the screen with room to spare, e.g. for high dpi displays.'''
+        size = int(min(self.window.winfo_screenwidth(),
+                       self.window.winfo_screenheight()) * SCREEN_SHARE)
+        # every col gets the same number of pixels
+        size -= size % 7
+        return Dimension(width=size, height=size)
+
+    def _change_resolution(self, dimension: Dimension) -> None:
+        self.window.set_resolution(dimension)
         self.window.show_settings_menu()
         # call the "next" frame as self will be destroyed when changing resolutions
         self.window.current_frame.show_settings_sub_menu(ResolutionMenu)
@@ -189,13 +218,15 @@ class ResolutionMenu(SubMenu):
     def _set_resolution_button(self):
         match self.window.settings.resolution:
             case Resolution.SMALL.value:
-                self._toggle_resolution_button(Resolution.SMALL)
+                self._toggle_resolution_button(Resolution.SMALL.name)
             case Resolution.MEDIUM.value:
-                self._toggle_resolution_button(Resolution.MEDIUM)
+                self._toggle_resolution_button(Resolution.MEDIUM.name)
+            case dimension if dimension == self._get_screen_dimension():
+                self._toggle_resolution_button('SCREEN')
 
-    def _toggle_resolution_button(self, resolution: Resolution):
+    def _toggle_resolution_button(self, name: str):
         for _resolution, button in self.resolution_buttons.items():
-            if _resolution == resolution.name:
+            if _resolution == name:
                 button.configure(state='disabled')
             else:
                 button.configure(state='active')
@@ -279,11 +310,19 @@ class MultiplayerMenu(SubMenu):
 
 
 class MultiplayerSubMenu(SubMenu):
-    '''Submenu for selecting the multiplayer mode.'''
+    '''
+    Submenu for selecting the multiplayer mode.
+    Games hosted on the local network are listed live,
+    selecting one fills in its ip, a double click joins or watches it.
+    '''
 
     def __init__(self, window) -> None:
         super().__init__(window=window)
         self.validation = self.register(self._validate_entry)
+        self.finder: GameFinder = GameFinder()
+        self.games: list[DiscoveredGame] = []
+        self.selected: DiscoveredGame = None
+        self.refresh: str = None
         self._prepare_multiplayer_sub_menu()
 
     def _validate_entry(self, what) -> bool:
@@ -298,9 +337,14 @@ class MultiplayerSubMenu(SubMenu):
             and ip.count('.') == 3 \
             and len(ip) >= 7
 
-    def _join_multiplayer(self, ip: str) -> None:
+    def _join_multiplayer(self, ip: str, watch: bool = False) -> None:
         if self._ip_valid(ip):
-            self.window.join_multiplayer(ip)
+            # a typed ip uses the default port
+            port = self.selected.port if self.selected and self.selected.ip == ip else None
+            if watch:
+                self.window.watch_multiplayer(ip, port=port)
+            else:
+                self.window.join_multiplayer(ip, port=port)
         else:
             title = self.window.translation.get('bad_ip_title')
             msg = self.window.translation.get('bad_ip_msg')
@@ -331,7 +375,75 @@ class MultiplayerSubMenu(SubMenu):
                       command=lambda: self._join_multiplayer(ip.get()))
         join_text = self.window.translation.get('multiplayer_join')
         self._configure_menu_button(button=join,
-                                    font=self.font,
+                                    font=self.small_font,
                                     text=join_text)
         self._place_menu_button(button=join,
                                 position=MenuPosition.BOTTOM)
+        # join and watch share the bottom row
+        join.place_configure(width=self.button_width//2)
+        watch = Button(master=self.window,
+                       command=lambda: self._join_multiplayer(ip.get(), watch=True))
+        watch_text = self.window.translation.get('multiplayer_watch')
+        self._configure_menu_button(button=watch,
+                                    font=self.small_font,
+                                    text=watch_text)
+        self._place_menu_button(button=watch,
+                                position=MenuPosition.BOTTOM)
+        watch.place_configure(x=self.button_margin_x + self.button_width//2,
+                              width=self.button_width//2)
+        self._prepare_lan_games(ip)
+
+    def _prepare_lan_games(self, ip: Entry) -> None:
+        '''Fills the space between host and ip with the games found on the network.'''
+        games = Listbox(master=self.window,
+                        font=Font(family='Cooper Black',
+                                  size=self.small_font.cget('size') // 2),
+                        background='pale turquoise',
+                        activestyle='none',
+                        exportselection=False)
+        games.place(x=self.button_margin_x,
+                    y=MenuPosition.MIDDLE.value * (self.button_height + self.button_margin_y) +
+                    self.button_margin_y * 5 // 4,
+                    width=self.button_width,
+                    height=self.button_height + self.button_margin_y // 4)
+        games.bind('<<ListboxSelect>>', lambda _: self._select_game(games, ip))
+        games.bind('<Double-Button-1>', lambda _: self._join_selected_game(ip))
+        # the frame shown is the menu this submenu was opened from
+        self.window.current_frame.bind('<Destroy>',
+                                       lambda _: self._stop_lan_games(games),
+                                       add='+')
+        self.finder.start()
+        self._refresh_lan_games(games)
+
+    def _refresh_lan_games(self, games: Listbox) -> None:
+        self.games = self.finder.get_games()
+        scrolled = games.yview()[0]
+        games.delete(0, 'end')
+        for index, game in enumerate(self.games):
+            ping = f'{game.ping * 1000:.0f} ms' if game.ping is not None else '-'
+            text = f'{game.ip}:{game.port}  {game.cols}x{game.rows}  {ping}'
+            if game.playing:
+                text += '  ' + self.window.translation.get('lan_playing')
+            games.insert('end', text)
+            if self.selected and (game.ip, game.port) == (self.selected.ip, self.selected.port):
+                games.selection_set(index)
+        games.yview_moveto(scrolled)
+        self.refresh = self.window.after(LAN_REFRESH, lambda: self._refresh_lan_games(games))
+
+    def _select_game(self, games: Listbox, ip: Entry) -> None:
+        selection = games.curselection()
+        if not selection or selection[0] >= len(self.games):
+            return
+        self.selected = self.games[selection[0]]
+        ip.delete(0, 'end')
+        ip.insert(0, self.selected.ip)
+
+    def _join_selected_game(self, ip: Entry) -> None:
+        '''Games that are already played can only be watched.'''
+        if self.selected:
+            self._join_multiplayer(ip.get(), watch=self.selected.playing)
+
+    def _stop_lan_games(self, games: Listbox) -> None:
+        self.finder.stop()
+        self.window.after_cancel(self.refresh)
+        games.destroy()
@@ -1,107 +1,213 @@
 '''Networking.'''
-from queue import Queue
-from socket import AF_INET, SOCK_STREAM, socket, timeout
-from threading import Event, Thread
-from typing import TYPE_CHECKING
+from collections import deque
+from concurrent.futures import Future
+from queue import Empty, Queue
+from threading import Event
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Callable
 
-from assets import MultiplayerCancelMessage, MultiplayerMessage
+from assets import POLL_INTERVAL, MultiplayerCancelMessage
+from helper.discovery_helper import DiscoveredGame, Discovery
+from helper.network_helper import NetworkEvent, Peer, get_network_loop
+from helper.protocol_helper import Message, MessageType
 
 if TYPE_CHECKING:
     from components import MainWindow
 
 
-class Communication:
-    '''Handles in and out.'''
+class Communication:  # pylint: disable=too-many-instance-attributes
+    '''
+    Handles in and out.
+    Sockets live on the network loop (helper/network_helper.py),
+    its events are picked up here by polling with after(), thus only tk's thread touches widgets.
+    '''
 
-    def __init__(self, window) -> None:
+    def __init__(self, window, cols: int = 7, rows: int = 6) -> None:
         self.window: MainWindow = window
-        self._port = 51231
+        self._port: int = window.settings.net_port
+        self._events: Queue = Queue()
+        self._peer: Peer = Peer(events=self._events, cols=cols, rows=rows,
+                                timeout=window.settings.net_timeout,
+                                reconnect=window.settings.net_reconnect)
         self._connected_event = Event()
-        self._connection: socket = None
+        # moves received but not yet taken by the game
+        self._moves: deque[int] = deque()
+        self._poll: str = None
+        self._closed: bool = False
+        # set by close, callbacks may close while events are handled
+        self._stopped: bool = False
+        self.hosting: bool = False
+        # spectators get SYNC and MOVE messages of both players here instead of waiting for moves
+        self.on_watch: Callable[[Message], None] = None
+        # the game is told about received moves and connection changes, see listen
+        self._on_move: Callable[[], None] = None
+        self._on_status: Callable[[str | None], None] = None
+        # when the last own move was sent, to time the round trip until the answer
+        self._sent_at: float = None
+
+    def _start_polling(self) -> None:
+        if self._poll is None and not self._stopped:
+            self._poll = self.window.after(POLL_INTERVAL, self._poll_events)
+
+    def _poll_events(self) -> None:
+        while not self._stopped:
+            try:
+                event, value = self._events.get_nowait()
+            except Empty:
+                break
+            match event:
+                case NetworkEvent.CONNECTED:
+                    self._connected_event.set()
+                    self._notify_status(None)
+                case NetworkEvent.MESSAGE:
+                    self._handle(value)
+                case NetworkEvent.RECONNECTING:
+                    print('Connection lost, reconnecting:', value)
+                    self.window.metrics.counter('network_reconnects').inc()
+                    self._notify_status('reconnecting')
+                case NetworkEvent.CLOSED:
+                    print('Connection lost:', value)
+                    self._closed = True
+                    self._connected_event.set()
+                    self._poll = None
+                    self._notify_status('connection_lost')
+                    return
+        if self._stopped:
+            # closed by a callback above, close already canceled this poll
+            return
+        self._poll = self.window.after(POLL_INTERVAL, self._poll_events)
+
+    def _handle(self, message: Message) -> None:
+        if self.on_watch and message.type in (MessageType.SYNC, MessageType.MOVE):
+            self.on_watch(message)
+            return
+        if message.type == MessageType.HEARTBEAT:
+            # an answer to a heartbeat sent by this game
+            self.window.metrics.histogram('network_rtt_seconds').observe(
+                monotonic() - message.values[1])
+        if message.type == MessageType.MOVE:
+            self._moves.append(message.values[0])
+            if self._on_move:
+                self._on_move()
+
+    def _notify_status(self, status: str | None) -> None:
+        if self._on_status:
+            self._on_status(status)
+
+    @property
+    def connected(self) -> bool:
+        '''False once the connection is gone for good.'''
+        return not self._closed
+
+    def listen(self, on_move: Callable[[], None],
+               on_status: Callable[[str | None], None]) -> None:
+        '''
+        on_move is called for every received move, take it with next_move.
+        on_status gets 'reconnecting', 'connection_lost' or None once connected (again).
+        Both are called from tk's main loop, never while another callback runs.
+        '''
+        self._on_move = on_move
+        self._on_status = on_status
 
     def connection_established(self) -> bool:
         '''Wait for an incoming connection.'''
-        Thread(target=self._wait_for_connection,
-               daemon=True).start()
+        self._peer.host(self._port)
+        self._start_polling()
         title = self.window.translation.get('multiplayer_host')
         msg = self.window.translation.get('multiplayer_host_msg')
         message = MultiplayerCancelMessage(frame=self.window.current_frame,
                                            event=self._connected_event,
                                            title=title,
                                            msg=msg)
-        if message.canceled:
+        if message.canceled or self._closed:
+            self.close()
             return False
+        self.hosting = True
         return True
 
-    def _wait_for_connection(self) -> None:
-        server_socket = socket(family=AF_INET, type=SOCK_STREAM)
-        server_socket.bind(('0.0.0.0', self._port))
-        server_socket.listen()
-        server_socket.settimeout(0.1)
-        while not self._connected_event.is_set():
-            try:
-                con, _ = server_socket.accept()
-                self._connection = con
-            except timeout:
-                continue
-            self._connected_event.set()
-        server_socket.close()
-
-    def get_move(self) -> int:
-        '''Waits for the next move.'''
-        receiving_event = Event()
-        received_move = Queue(maxsize=1)
-        Thread(target=self._get_move,
-               args=[received_move, receiving_event],
-               daemon=True).start()
-        title = self.window.translation.get('multiplayer_get_move')
-        msg = self.window.translation.get('multiplayer_get_move_msg')
-        MultiplayerMessage(frame=self.window.current_frame,
-                           event=receiving_event,
-                           title=title,
-                           msg=msg)
-        return received_move.get()
-
-    def _get_move(self, queue: Queue, event: Event) -> None:
-        while not event.is_set():
-            data = self._connection.recv(1)
-            if len(data) == 1:
-                move = data.decode(encoding='utf-8')
-                queue.put(int(move))
-                event.set()
-
-    def send_move(self, move: int) -> None:
-        '''Makes a move.'''
-        data = str(move).encode(encoding='utf-8')
-        self._connection.send(data)
-
-    def joined_game(self, ip: str) -> bool:
-        '''Join a game.'''
-        Thread(target=self._join_game,
-               args=[ip],
-               daemon=True).start()
+    def has_move(self) -> bool:
+        '''True if a received move waits to be taken.'''
+        return bool(self._moves)
+
+    def next_move(self) -> int:
+        '''Takes the oldest received move, never waits, check has_move first.'''
+        move = self._moves.popleft()
+        if self._sent_at is not None:
+            # includes the time the other player thought about the move
+            self.window.metrics.histogram('network_move_round_trip_seconds').observe(
+                perf_counter() - self._sent_at)
+            self._sent_at = None
+        self.window.metrics.counter('network_moves_received').inc()
+        return move
+
+    def send_move(self, move: int, ply: int) -> None:
+        '''Makes a move, ply is the number of coins before the move.'''
+        self._peer.send(MessageType.MOVE, move, ply)
+        self._sent_at = perf_counter()
+        self.window.metrics.counter('network_moves_sent').inc()
+
+    def joined_game(self, ip: str, port: int = None) -> bool:
+        '''Join a game, hosted on the default port unless given.'''
+        self._peer.join(ip, port or self._port)
+        self._start_polling()
         title = self.window.translation.get('multiplayer_join')
         msg = self.window.translation.get('multiplayer_join_msg')
         message = MultiplayerCancelMessage(frame=self.window.current_frame,
                                            event=self._connected_event,
                                            title=title,
                                            msg=msg)
-        if message.canceled:
-            self._connection.close()
+        if message.canceled or self._closed:
+            self.close()
             return False
         return True
 
-    def _join_game(self, ip: str) -> None:
-        while not self._connected_event.is_set():
-            self._connection = socket(family=AF_INET, type=SOCK_STREAM)
-            self._connection.settimeout(0.1)
-            try:
-                self._connection.connect((ip, self._port))
-            except timeout:
-                continue
-            except OSError as ex:
-                # 10038 happens if socket is closed from main thread before this thread is stopped
-                if '10038' in str(ex):
-                    break
-            self._connection.settimeout(None)
-            self._connected_event.set()
+    def watched_game(self, ip: str, on_watch: Callable[[Message], None],
+                     port: int = None) -> bool:
+        '''Watch a game hosted on the ip, SYNC and MOVE messages are passed to on_watch.'''
+        self.on_watch = on_watch
+        self._peer.spectate(ip, port or self._port)
+        self._start_polling()
+        title = self.window.translation.get('multiplayer_watch')
+        msg = self.window.translation.get('multiplayer_watch_msg')
+        message = MultiplayerCancelMessage(frame=self.window.current_frame,
+                                           event=self._connected_event,
+                                           title=title,
+                                           msg=msg)
+        if message.canceled or self._closed:
+            self.close()
+            return False
+        return True
+
+    def close(self) -> None:
+        '''Closes the connection, or stops waiting for one. No callback is called after.'''
+        self._stopped = True
+        self.on_watch = None
+        self._on_move = None
+        self._on_status = None
+        self._peer.close()
+        if self._poll:
+            self.window.after_cancel(self._poll)
+            self._poll = None
+
+
+class GameFinder:
+    '''Lists the games hosted on the local network while started.'''
+
+    def __init__(self) -> None:
+        self._discovery: Discovery = Discovery()
+        self._listening: Future = None
+
+    def start(self) -> None:
+        '''Listens for announced games on the network loop.'''
+        if self._listening is None:
+            self._listening = get_network_loop().submit(self._discovery.listen())
+
+    def stop(self) -> None:
+        '''Stops listening, the games found so far are kept until they expire.'''
+        if self._listening:
+            self._listening.cancel()
+            self._listening = None
+
+    def get_games(self) -> list[DiscoveredGame]:
+        '''Games announced within the last seconds, never waits.'''
+        return self._discovery.get_games()
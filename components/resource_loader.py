@@ -1,63 +1,148 @@
 '''Prepares all resources.'''
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from math import ceil
 from os import getcwd, path
-from tkinter import PhotoImage
+from tkinter import PhotoImage, TclError
+from typing import TYPE_CHECKING
 
-from assets import Dimension, Resolution
+from assets import Dimension
+from engine import WorkerPool
+from helper.image_helper import get_png_size, scale_png
+from helper.layout_helper import get_image_size
 
+if TYPE_CHECKING:
+    from components import MainWindow
 
-class Resources:  # pylint: disable=too-few-public-methods
-    '''Contains all resource references.'''
+# scaled images kept in memory, those of the current dimension are never dropped
+MAX_IMAGES = 32
+# milliseconds between two checks for images scaled in the background
+SCALE_POLL = 50
+# file of each image below res/ by group and name
+ASSETS: dict[str, dict[str, str]] = {
+    'main': {
+        'bg': 'menu_background.png'
+    },
+    'cell': {
+        'empty': path.join('cell', 'empty_cell.png'),
+        'player1': path.join('cell', 'purple_cell.png'),
+        'player2': path.join('cell', 'yellow_cell.png')
+    },
+    'entry': {
+        'empty': path.join('entry_point', 'empty_entry.png'),
+        'player1': path.join('entry_point', 'purple_entry.png'),
+        'player2': path.join('entry_point', 'yellow_entry.png')
+    }
+}
 
-    def __init__(self) -> None:
+
+class ImageGroup:  # pylint: disable=too-few-public-methods
+    '''Images of a group by name, each is loaded when first asked for.'''
+
+    def __init__(self, resources: 'Resources', group: str) -> None:
+        self.resources: Resources = resources
+        self.group: str = group
+
+    def __getitem__(self, name: str) -> PhotoImage:
+        return self.resources.get_image(group=self.group, name=name)
+
+
+class Resources:  # pylint: disable=too-many-instance-attributes
+    '''
+    Contains all resource references.
+    - images are scaled for the dimension when first used, widgets ask by images[group][name]
+    - up to MAX_IMAGES scaled images stay in memory, switching back to a dimension is instant
+    - scaled images are also written to cache/images, later launches load them without scaling
+    - scaling runs in another process, meanwhile a roughly scaled preview is shown,
+      once done the image is replaced in place and every widget showing it updates
+    '''
+
+    def __init__(self, window) -> None:
+        self.window: MainWindow = window
         self.base_path = path.join(getcwd(), 'res')
-        self.images: dict[str, dict[str, PhotoImage]] = {}
+        self.cache_path = path.join(getcwd(), 'cache', 'images')
+        self.dimension: Dimension = None
+        self.images: dict[str, ImageGroup] = {group: ImageGroup(resources=self, group=group)
+                                              for group in ASSETS}
+        # (group, name, width, height) -> image, least recently used first
+        self._cache: OrderedDict[tuple[str, str, int, int], PhotoImage] = OrderedDict()
+        self._pool: WorkerPool = WorkerPool(name='Image scaling', workers=1)
+        # previews waiting for their scaled image of width x height
+        self._scaling: list[tuple[Future, PhotoImage, tuple[int, int]]] = []
+        self._poll: str = None
 
     def prepare_images(self, dimension: Dimension) -> None:
-        '''Loads all resources. This needs to be called after Tk()!'''
-        self.images.clear()
-        bg_image = PhotoImage(file=path.join(self.base_path,
-                                             'menu_background.png'))
-        match dimension:
-            case Resolution.SMALL.value:
-                bg_image = bg_image.zoom(5).subsample(8)
-            case Resolution.MEDIUM.value:
-                bg_image = bg_image.zoom(7).subsample(8)
-        self.images.update({'main': {'bg': bg_image}})
-        self.images.update({'cell': self._get_cell_images(dimension)})
-        self.images.update({'entry': self._get_entry_images(dimension)})
-
-    def _get_cell_images(self, dimension: Dimension) -> dict[str, PhotoImage]:
-        cell_path = path.join(self.base_path, 'cell')
-        empty_image = PhotoImage(file=path.join(cell_path,
-                                                'empty_cell.png'))
-        player1_image = PhotoImage(file=path.join(cell_path,
-                                                  'purple_cell.png'))
-        player2_image = PhotoImage(file=path.join(cell_path,
-                                                  'yellow_cell.png'))
-        if dimension == Resolution.SMALL.value:
-            empty_image = empty_image.zoom(5).subsample(7)
-            player1_image = player1_image.zoom(5).subsample(7)
-            player2_image = player2_image.zoom(5).subsample(7)
-        return {
-            'empty': empty_image,
-            'player1': player1_image,
-            'player2': player2_image
-        }
-
-    def _get_entry_images(self, dimension: Dimension) -> dict[str, PhotoImage]:
-        entry_path = path.join(self.base_path, 'entry_point')
-        empty_image = PhotoImage(file=path.join(entry_path,
-                                                'empty_entry.png'))
-        player1_image = PhotoImage(file=path.join(entry_path,
-                                                  'purple_entry.png'))
-        player2_image = PhotoImage(file=path.join(entry_path,
-                                                  'yellow_entry.png'))
-        if dimension == Resolution.SMALL.value:
-            empty_image = empty_image.zoom(5).subsample(7)
-            player1_image = player1_image.zoom(5).subsample(7)
-            player2_image = player2_image.zoom(5).subsample(7)
-        return {
-            'empty': empty_image,
-            'player1': player1_image,
-            'player2': player2_image
-        }
+        '''Switches to the images of the dimension. This needs to be called after Tk()!'''
+        self.dimension = dimension
+
+    def get_image(self, group: str, name: str) -> PhotoImage:
+        '''The image scaled for the current dimension.'''
+        key = (group, name, self.dimension.width, self.dimension.height)
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            return image
+        image = self._load_image(group=group, name=name)
+        self._cache[key] = image
+        self._drop_images()
+        return image
+
+    def _load_image(self, group: str, name: str) -> PhotoImage:
+        source_path = path.join(self.base_path, ASSETS[group][name])
+        width, height = get_image_size(group, self.dimension.width, self.dimension.height)
+        source_width, source_height = get_png_size(source_path)
+        if (width, height) == (source_width, source_height):
+            return PhotoImage(file=source_path)
+        cache_path = path.join(self.cache_path, f'{group}_{name}_{width}x{height}.png')
+        if path.exists(cache_path) and path.getmtime(cache_path) >= path.getmtime(source_path):
+            try:
+                return PhotoImage(file=cache_path)
+            except TclError:
+                # broken, scaled again below
+                pass
+        # whole factors only, thus cheap but at most as large as the scaled image
+        image = PhotoImage(file=source_path)
+        if source_width > width or source_height > height:
+            image = image.subsample(ceil(source_width / width), ceil(source_height / height))
+        else:
+            image = image.zoom(width // source_width, height // source_height)
+        self._scale(image, source_path, cache_path, (width, height))
+        return image
+
+    def _scale(self, image: PhotoImage, source_path: str, cache_path: str,
+               size: tuple[int, int]) -> None:
+        '''Replaces the preview by the scaled image once the worker wrote it.'''
+        future = self._pool.submit(scale_png, source_path, cache_path, *size)
+        if future is None:
+            # the preview stays
+            return
+        self._scaling.append((future, image, size))
+        if self._poll is None:
+            self._poll = self.window.after(SCALE_POLL, self._check_scaling)
+
+    def _check_scaling(self) -> None:
+        for scaling in [scaling for scaling in self._scaling if scaling[0].done()]:
+            self._scaling.remove(scaling)
+            future, image, (width, height) = scaling
+            try:
+                image.configure(file=future.result(), width=width, height=height)
+            except (OSError, ValueError, TclError, BrokenProcessPool) as ex:
+                # the preview stays
+                print('Failed to scale image:', ex)
+        self._poll = None
+        if self._scaling:
+            self._poll = self.window.after(SCALE_POLL, self._check_scaling)
+
+    def close(self) -> None:
+        '''Stops scaling, unfinished images are scaled again on the next launch.'''
+        self._pool.close()
+
+    def _drop_images(self) -> None:
+        '''Forgets the least recently used images of other dimensions above MAX_IMAGES.'''
+        current = (self.dimension.width, self.dimension.height)
+        for key in list(self._cache):
+            if len(self._cache) <= MAX_IMAGES:
+                return
+            if key[2:] != current:
+                del self._cache[key]
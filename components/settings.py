@@ -3,10 +3,10 @@ import json
 from json.decoder import JSONDecodeError
 from os import getcwd, makedirs, path, remove
 
-from assets import Difficulty, Dimension, Language, Resolution
+from assets import Difficulty, Dimension, Language, Renderer, Resolution
 
 
-class Settings:
+class Settings:  # pylint: disable=too-many-instance-attributes
     '''Setting class provides a way to dump and store settings.'''
 
     def __init__(self) -> None:
@@ -15,6 +15,26 @@ class Settings:
         self.resolution: Dimension = Resolution.MEDIUM.value
         self.language: Language = Language.ENGLISH.value
         self.last_ip: str = ''
+        # seconds the perfect bot may think about a move
+        self.bot_time: float = 1.0
+        # megabytes the perfect bot may use to remember positions
+        self.bot_memory: int = 16
+        # processes the perfect bot searches with, 0 uses one per cpu
+        self.bot_workers: int = 1
+        # records bot, network and frame timings to metrics.json when closing the game
+        self.metrics: bool = False
+        # serves the metrics on http://127.0.0.1:<port>/metrics while playing, 0 does not
+        self.metrics_port: int = 0
+        # profiles bot moves and ui callbacks into profiles/, also CONNECT_FOUR_PROFILE=1
+        self.profile: bool = False
+        # seconds without any message before a network game counts as disconnected
+        self.net_timeout: float = 5.0
+        # seconds a lost network game waits for the other game to reconnect
+        self.net_reconnect: float = 30.0
+        # port a hosted game listens on, the next free one if taken
+        self.net_port: int = 51231
+        # 'widgets' or 'canvas', how the board is drawn
+        self.renderer: str = Renderer.WIDGETS.value
 
     def _dump(self) -> bool:
         self_dict = {
@@ -24,7 +44,17 @@ class Settings:
                 "height": self.resolution.height
             },
             "language": self.language,
-            "last_ip": self.last_ip
+            "last_ip": self.last_ip,
+            "bot_time": self.bot_time,
+            "bot_memory": self.bot_memory,
+            "bot_workers": self.bot_workers,
+            "metrics": self.metrics,
+            "metrics_port": self.metrics_port,
+            "profile": self.profile,
+            "net_timeout": self.net_timeout,
+            "net_reconnect": self.net_reconnect,
+            "net_port": self.net_port,
+            "renderer": self.renderer
         }
         try:
             with open(file=self.path, mode='w', encoding='utf-8') as file_handle:
@@ -55,6 +85,16 @@ class Settings:
                                         height=new_settings['dimension']['height'])
             self.language = new_settings['language']
             self.last_ip = new_settings['last_ip']
+            self.bot_time = new_settings['bot_time']
+            self.bot_memory = new_settings['bot_memory']
+            self.bot_workers = new_settings['bot_workers']
+            self.metrics = new_settings['metrics']
+            self.metrics_port = new_settings['metrics_port']
+            self.profile = new_settings['profile']
+            self.net_timeout = new_settings['net_timeout']
+            self.net_reconnect = new_settings['net_reconnect']
+            self.net_port = new_settings['net_port']
+            self.renderer = new_settings['renderer']
             return True
         except (KeyError, JSONDecodeError):
             return self._dump()
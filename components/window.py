@@ -1,15 +1,22 @@
 '''Contains a root window that renders the other components.'''
+from os import getcwd, path
+from time import perf_counter
 from tkinter import Frame, Tk
 
 from assets import Dimension
+from helper.metrics_helper import MetricsRegistry, get_registry
 
-from .game import GameFrame
+from .animation import Animator
+from .game import GameFrame, SpectatorFrame
 from .menu import MainMenu, MenuFrame, MultiplayerMenu, SettingsMenu
 from .network import Communication
 from .resource_loader import Resources
 from .settings import Settings
 from .translation import TranslationTable
 
+# milliseconds between two measured frames
+FRAME_INTERVAL = 16
+
 
 class MainWindow(Tk):
     '''The main window the user interacts with.'''
@@ -23,12 +30,35 @@ class MainWindow(Tk):
         self.iconbitmap(r"res\icon.ico")
         self.current_frame: Frame = None
         self.settings: Settings = settings
-        self.resources: Resources = Resources()
+        self.metrics: MetricsRegistry = get_registry(enabled=settings.metrics)
+        if self.metrics.enabled:
+            if self.settings.metrics_port:
+                self.metrics.serve(self.settings.metrics_port)
+            self.after(FRAME_INTERVAL, self._measure_frame, perf_counter())
+        self.animator: Animator = Animator(self)
+        self.resources: Resources = Resources(self)
         self.resources.prepare_images(self.settings.resolution)
         self.translation = TranslationTable(language=settings.language)
         self.title(self.translation.get("title"))
         self.show_main_menu()
 
+    def _measure_frame(self, scheduled: float) -> None:
+        '''
+        Measures how long the main loop takes to come back to this callback.
+        Anything above FRAME_INTERVAL blocked the ui for that long.
+        '''
+        now = perf_counter()
+        self.metrics.histogram('ui_frame_seconds').observe(now - scheduled)
+        self.after(FRAME_INTERVAL, self._measure_frame, now)
+
+    def destroy(self) -> None:
+        '''Writes the metrics of this session before closing.'''
+        if self.metrics.enabled:
+            self.metrics.dump(path.join(getcwd(), 'metrics.json'))
+            self.metrics.shutdown()
+        self.resources.close()
+        super().destroy()
+
     def _get_starting_position(self, width: int, height: int) -> str:
         '''
         Returns a geometry string of the tkinter format:
@@ -67,7 +97,8 @@ class MainWindow(Tk):
                     width=self.settings.resolution.width,
                     height=self.settings.resolution.height)
         self.current_frame = frame
-        self.update()
+        # draws the frame without handling events in between, e.g. a second click
+        self.update_idletasks()
 
     def show_main_menu(self) -> None:
         '''Renders the main menu.'''
@@ -103,17 +134,26 @@ class MainWindow(Tk):
             return self._update_frame(multiplayer)
         return multiplayer.destroy()
 
-    def join_multiplayer(self, ip: str) -> None:
-        '''Joins a 2 player versus.'''
+    def join_multiplayer(self, ip: str, port: int = None) -> None:
+        '''Joins a 2 player versus, port is only known for games found on the network.'''
         self.settings.last_ip = ip
         self.settings.save()
         multiplayer: GameFrame = GameFrame(window=self, solo=False,
                                            communication=Communication(self))
-        if multiplayer.com.joined_game(ip):
+        if multiplayer.com.joined_game(ip, port=port):
             multiplayer.new_game()
             self._update_frame(multiplayer)
-            multiplayer.player_turn = False
-            multiplayer.make_move(multiplayer.com.get_move())
+
+    def watch_multiplayer(self, ip: str, port: int = None) -> None:
+        '''Watches a 2 player versus hosted on the ip.'''
+        self.settings.last_ip = ip
+        self.settings.save()
+        spectator: SpectatorFrame = SpectatorFrame(window=self,
+                                                   communication=Communication(self))
+        if spectator.watch(ip, port=port):
+            self._update_frame(spectator)
+            return None
+        return spectator.destroy()
 
     def set_difficulty(self, difficulty: int) -> None:
         '''Changes the difficulty to given value.'''
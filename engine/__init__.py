@@ -0,0 +1,10 @@
+'''prepare imports for cleaner imports'''
+from .bitboard import BitBoard
+from .dataclasses import Difficulty, Move
+from .game import GameState
+from .lines import WinningLines, get_winning_lines
+from .opening_book import (BOOK_DEPTH, BOOK_PLIES, OpeningBook,
+                           build_opening_book, get_book_path, get_opening_book)
+from .parallel import SearchPool, WorkerPool, get_search_pool
+from .solver import Solver
+from .transposition import TranspositionTable
@@ -0,0 +1,171 @@
+'''Bitboard representation of the board used for all computation.'''
+from functools import lru_cache
+
+from .lines import get_winning_lines
+
+
+@lru_cache(maxsize=None)
+def _get_line_masks(cols: int, rows: int) -> tuple[int, ...]:
+    '''
+    Masks of the four lines through each cell, indexed by bit index.
+    Each mask is the union of all winning windows going through the cell.
+    '''
+    lines = get_winning_lines(cols=cols, rows=rows)
+    line_masks = [0] * (cols * (rows + 1))
+    for cell, window_indices in enumerate(lines.windows_by_cell):
+        for window_index in window_indices:
+            line_masks[lines.bit_index(cell)] |= lines.window_masks[window_index]
+    return tuple(line_masks)
+
+
+class BitBoard:  # pylint: disable=too-many-instance-attributes
+    '''
+    Board state stored in two integers.
+
+    Each col uses rows + 1 bits, starting with the bottom cell.
+    The additional bit on top of each col always stays empty,
+    thus shifting never connects coins of neighbouring cols.
+    For the default 7x6 board the bits are indexed like this:
+
+    .  .  .  .  .  .  .
+    5 12 19 26 33 40 47
+    4 11 18 25 32 39 46
+    3 10 17 24 31 38 45
+    2  9 16 23 30 37 44
+    1  8 15 22 29 36 43
+    0  7 14 21 28 35 42
+
+    - position contains the coins of the player to move
+    - mask contains all coins on the board
+    '''
+
+    def __init__(self, cols: int = 7, rows: int = 6) -> None:
+        self.cols: int = cols
+        self.rows: int = rows
+        self.position: int = 0
+        self.mask: int = 0
+        self.moves: int = 0
+        self.size: int = cols * rows
+        self.heights: list[int] = [0] * cols
+        self.history: list[int] = []
+        self._col_height = rows + 1
+        self._bottom_masks = [1 << (col * self._col_height)
+                              for col in range(0, cols, 1)]
+        self._bottom_mask = sum(self._bottom_masks)
+        self._board_mask = self._bottom_mask * ((1 << rows) - 1)
+        # vertical, horizontal, falling and rising diagonal
+        self._shifts = (1, self._col_height,
+                        self._col_height - 1, self._col_height + 1)
+        self._line_masks = _get_line_masks(cols, rows)
+
+    @property
+    def current_player(self) -> int:
+        '''Player 1 always starts, thus the player to move follows from the move count.'''
+        return 1 if self.moves % 2 == 0 else 2
+
+    def copy(self) -> 'BitBoard':
+        '''Returns an independent copy of this state.'''
+        state = BitBoard(cols=self.cols, rows=self.rows)
+        state.position = self.position
+        state.mask = self.mask
+        state.moves = self.moves
+        state.heights = self.heights.copy()
+        state.history = self.history.copy()
+        return state
+
+    def key(self) -> int:
+        '''Unique number of the position, the mask adds a bit on top of each col.'''
+        return self.position + self.mask
+
+    def can_play(self, col: int) -> bool:
+        '''True if the col exists and is not full.'''
+        return 0 <= col < self.cols and self.heights[col] < self.rows
+
+    def play(self, col: int) -> None:
+        '''Drops a coin of the current player into the col. Needs can_play first!'''
+        self.position ^= self.mask
+        self.mask |= self.mask + self._bottom_masks[col]
+        self.heights[col] += 1
+        self.moves += 1
+        self.history.append(col)
+
+    def undo(self) -> int:
+        '''Takes back the last move and returns its col.'''
+        col = self.history.pop()
+        self.heights[col] -= 1
+        self.moves -= 1
+        self.mask ^= self._bottom_masks[col] << self.heights[col]
+        self.position ^= self.mask
+        return col
+
+    def legal_moves_mask(self) -> int:
+        '''Mask of the cells a coin would land in, one bit per playable col.'''
+        return (self.mask + self._bottom_mask) & self._board_mask
+
+    def get_possible_moves(self) -> list[int]:
+        '''All cols that are not full yet.'''
+        return [col for col in range(0, self.cols, 1)
+                if self.heights[col] < self.rows]
+
+    def get_stones(self, player: int) -> int:
+        '''Mask of all coins owned by the given player.'''
+        if player == self.current_player:
+            return self.position
+        return self.position ^ self.mask
+
+    def get_player(self, col: int, height: int) -> int:
+        '''
+        Player owning the cell, -1 if empty.
+        Height is counted from the bottom of the col.
+        '''
+        cell = self._bottom_masks[col] << height
+        if not self.mask & cell:
+            return -1
+        if self.position & cell:
+            return self.current_player
+        return 2 if self.current_player == 1 else 1
+
+    def is_winning_move(self, col: int, player: int = None) -> bool:
+        '''True if dropping a coin into col connects four for the player.'''
+        if player is None:
+            player = self.current_player
+        index = col * self._col_height + self.heights[col]
+        return self._connects_four(self.get_stones(player) | (1 << index), index)
+
+    def last_move_won(self) -> bool:
+        '''
+        True if the last move connected four.
+        Only the four lines through the last coin are checked.
+        '''
+        if not self.history:
+            return False
+        col = self.history[-1]
+        index = col * self._col_height + self.heights[col] - 1
+        return self._connects_four(self.position ^ self.mask, index)
+
+    def has_won(self) -> bool:
+        '''True if the player that moved last has connected four anywhere.'''
+        return self._has_alignment(self.position ^ self.mask)
+
+    def is_full(self) -> bool:
+        '''True if no cell is empty.'''
+        return self.moves == self.size
+
+    def _connects_four(self, stones: int, index: int) -> bool:
+        '''
+        True if the stones connect four through the cell at the bit index.
+        Everything but the four lines through the cell is masked away first.
+        '''
+        return self._has_alignment(stones & self._line_masks[index])
+
+    def _has_alignment(self, stones: int) -> bool:
+        '''
+        Shift and mask check for 4 connected in any direction.
+        Shifting by 1 is vertical, by col height horizontal
+        and by col height -1/+1 diagonal.
+        '''
+        for shift in self._shifts:
+            pairs = stones & (stones >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
@@ -0,0 +1,23 @@
+'''Dataclasses of the engine, usable without tkinter.'''
+from dataclasses import dataclass
+from enum import Enum
+
+
+class Difficulty(Enum):
+    '''Constants for the difficulties.'''
+    EASY = 0
+    MEDIUM = 1
+    HARD = 2
+    EXTREME = 3
+    PERFECT = 4
+
+
+@dataclass(frozen=True)
+class Move:
+    '''
+    A coin dropped into the board.
+    Row starts at the top like Position.y.
+    '''
+    col: int
+    row: int
+    player: int
@@ -0,0 +1,95 @@
+'''Rules of a game without any rendering.'''
+from typing import Callable
+
+from .bitboard import BitBoard
+from .dataclasses import Move
+from .lines import get_winning_lines
+
+
+class GameState:
+    '''
+    A single game: applies moves, tracks turns, detects wins and draws.
+    Views subscribe to get every applied move, nothing here needs a display.
+    '''
+
+    def __init__(self, cols: int = 7, rows: int = 6) -> None:
+        self.board: BitBoard = BitBoard(cols=cols, rows=rows)
+        # -1 as long as nobody has won
+        self.winner: int = -1
+        self._listeners: list[Callable[[Move], None]] = []
+
+    @property
+    def cols(self) -> int:
+        '''Number of cols of the board.'''
+        return self.board.cols
+
+    @property
+    def rows(self) -> int:
+        '''Number of rows of the board.'''
+        return self.board.rows
+
+    @property
+    def current_player(self) -> int:
+        '''Player to move next.'''
+        return self.board.current_player
+
+    @property
+    def history(self) -> list[int]:
+        '''Cols of all moves so far.'''
+        return self.board.history.copy()
+
+    def subscribe(self, listener: Callable[[Move], None]) -> None:
+        '''The listener is called with every applied move.'''
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[Move], None]) -> None:
+        '''Stops notifying the listener.'''
+        self._listeners.remove(listener)
+
+    def reset(self) -> None:
+        '''Starts over on an empty board of the same size, listeners stay subscribed.'''
+        self.board = BitBoard(cols=self.cols, rows=self.rows)
+        self.winner = -1
+
+    def get_possible_moves(self) -> list[int]:
+        '''All cols a coin can be dropped into, none once the game is over.'''
+        if self.is_over():
+            return []
+        return self.board.get_possible_moves()
+
+    def play(self, col: int) -> bool:
+        '''
+        Drops a coin of the current player into the col.
+        False if the game is over or the col is full, nothing changes then.
+        '''
+        if self.is_over() or not self.board.can_play(col):
+            return False
+        move = Move(col=col,
+                    row=self.rows - 1 - self.board.heights[col],
+                    player=self.current_player)
+        self.board.play(col)
+        if self.board.last_move_won():
+            self.winner = move.player
+        for listener in self._listeners:
+            listener(move)
+        return True
+
+    def is_over(self) -> bool:
+        '''True if someone won or the board is full.'''
+        return self.winner != -1 or self.board.is_full()
+
+    def get_winning_cells(self) -> list[tuple[int, int]]:
+        '''(col, row) of every cell in a line of four of the winner, rows start at the top.'''
+        if self.winner == -1:
+            return []
+        lines = get_winning_lines(cols=self.cols, rows=self.rows)
+        stones = self.board.get_stones(self.winner)
+        cells = {cell
+                 for window, mask in zip(lines.windows, lines.window_masks)
+                 if stones & mask == mask
+                 for cell in window}
+        return sorted(divmod(cell, self.rows) for cell in cells)
+
+    def is_draw(self) -> bool:
+        '''True if the board is full without a winner.'''
+        return self.winner == -1 and self.board.is_full()
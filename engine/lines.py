@@ -0,0 +1,58 @@
+'''Index of all winning lines, built once per board shape.'''
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@dataclass(frozen=True)
+class WinningLines:
+    '''
+    All windows of 4 cells that win the game if one player fills them.
+    Cells are flat indices: col * rows + row_index,
+    with row_index starting at the top like Position.y.
+    '''
+    cols: int
+    rows: int
+    # the cells of each window
+    windows: tuple[tuple[int, int, int, int], ...]
+    # the windows going through each cell
+    windows_by_cell: tuple[tuple[int, ...], ...]
+    # each window as bitboard mask
+    window_masks: tuple[int, ...]
+
+    def bit_index(self, cell: int) -> int:
+        '''Converts a flat cell index to its bit in the bitboard.'''
+        return _get_bit_index(cell=cell, rows=self.rows)
+
+
+def _get_bit_index(cell: int, rows: int) -> int:
+    '''Bitboard cols are one bit higher and start at the bottom.'''
+    col, row_index = divmod(cell, rows)
+    return col * (rows + 1) + rows - 1 - row_index
+
+
+@lru_cache(maxsize=None)
+def get_winning_lines(cols: int, rows: int) -> WinningLines:
+    '''Collects every window of 4 on the board. Cached per (cols, rows).'''
+    windows: list[tuple[int, int, int, int]] = []
+    # vertical, horizontal, rising and falling diagonal
+    for step_col, step_row in ((0, 1), (1, 0), (1, -1), (1, 1)):
+        for col in range(0, cols, 1):
+            for row in range(0, rows, 1):
+                end_col = col + 3 * step_col
+                end_row = row + 3 * step_row
+                if not (0 <= end_col < cols and 0 <= end_row < rows):
+                    continue
+                windows.append(tuple((col + step * step_col) * rows + row + step * step_row
+                                     for step in range(0, 4, 1)))
+    windows_by_cell: list[list[int]] = [[] for _ in range(0, cols * rows, 1)]
+    for window_index, window in enumerate(windows):
+        for cell in window:
+            windows_by_cell[cell].append(window_index)
+    window_masks = [sum(1 << _get_bit_index(cell=cell, rows=rows) for cell in window)
+                    for window in windows]
+    return WinningLines(cols=cols,
+                        rows=rows,
+                        windows=tuple(windows),
+                        windows_by_cell=tuple(tuple(cell_windows)
+                                              for cell_windows in windows_by_cell),
+                        window_masks=tuple(window_masks))
@@ -0,0 +1,152 @@
+'''Opening book of precomputed moves, read through mmap.'''
+import mmap
+import struct
+from functools import lru_cache
+from os import getcwd, makedirs, path
+
+from .bitboard import BitBoard
+from .solver import Solver
+from .transposition import TranspositionTable
+
+BOOK_MAGIC = b'C4BK'
+BOOK_VERSION = 1
+# magic, version, cols, rows, plies, entry count
+HEADER = struct.Struct('<4sBBBBI')
+# canonical key, best move
+ENTRY = struct.Struct('<Qb')
+# coins and search depth the shipped books are built with, build_book.py defaults to them
+BOOK_PLIES = 4
+BOOK_DEPTH = 8
+
+
+def get_book_path(cols: int, rows: int) -> str:
+    '''Books are versioned by board dimension, each shape has its own file.'''
+    return path.join(getcwd(), 'res', 'book', f'book_{cols}x{rows}.bin')
+
+
+def get_canonical_key(state: BitBoard) -> tuple[int, bool]:
+    '''
+    The smaller key of the position and its mirror image.
+    True if the mirrored key was taken, the move needs to be mirrored as well then.
+    '''
+    key = state.key()
+    col_height = state.rows + 1
+    col_mask = (1 << col_height) - 1
+    mirrored_key = 0
+    for col in range(0, state.cols, 1):
+        col_key = (key >> (col * col_height)) & col_mask
+        mirrored_key |= col_key << ((state.cols - 1 - col) * col_height)
+    if mirrored_key < key:
+        return mirrored_key, True
+    return key, False
+
+
+class OpeningBook:  # pylint: disable=too-few-public-methods
+    '''
+    Sorted book file, searched binary without loading it into memory.
+    The header stores the board dimension the book was built for,
+    books of any other dimension are never used.
+    '''
+
+    def __init__(self, file_path: str, cols: int, rows: int) -> None:
+        self.cols: int = cols
+        self.rows: int = rows
+        self.plies: int = 0
+        self.count: int = 0
+        self._book: mmap.mmap = None
+        self._open(file_path)
+
+    def _open(self, file_path: str) -> None:
+        if not path.exists(file_path) or path.getsize(file_path) < HEADER.size:
+            return
+        with open(file=file_path, mode='rb') as file_handle:
+            book = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, cols, rows, plies, count = HEADER.unpack_from(book, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION \
+                or (cols, rows) != (self.cols, self.rows) \
+                or len(book) != HEADER.size + count * ENTRY.size:
+            print(f'Ignoring opening book \'{file_path}\':',
+                  f'built for {cols}x{rows} version {version}!')
+            book.close()
+            return
+        self._book = book
+        self.plies = plies
+        self.count = count
+
+    def get_move(self, state: BitBoard) -> int | None:
+        '''The book move for the position or None if the position is not in the book.'''
+        if self._book is None or state.moves > self.plies \
+                or (state.cols, state.rows) != (self.cols, self.rows):
+            return None
+        key, mirrored = get_canonical_key(state)
+        low = 0
+        high = self.count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            entry_key, move = ENTRY.unpack_from(self._book,
+                                                HEADER.size + middle * ENTRY.size)
+            if entry_key < key:
+                low = middle + 1
+            elif entry_key > key:
+                high = middle - 1
+            else:
+                return self.cols - 1 - move if mirrored else move
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_opening_book(cols: int, rows: int) -> OpeningBook:
+    '''Opens the book of the board dimension once.'''
+    return OpeningBook(file_path=get_book_path(cols=cols, rows=rows),
+                       cols=cols,
+                       rows=rows)
+
+
+def build_opening_book(cols: int, rows: int, plies: int, depth: int,
+                       file_path: str = None) -> int:
+    '''
+    Searches every position up to the given plies to the given depth and writes the book.
+    Mirrored positions are stored once. Returns the number of stored positions.
+    '''
+    if cols * (rows + 1) > 64:
+        raise ValueError(f'Board {cols}x{rows} does not fit into 64 bit book keys!')
+    if file_path is None:
+        file_path = get_book_path(cols=cols, rows=rows)
+    solver = Solver(time_budget=float('inf'),
+                    max_depth=depth,
+                    transpositions=TranspositionTable(max_memory=64 * 1024 * 1024))
+    entries: dict[int, int] = {}
+    positions = [BitBoard(cols=cols, rows=rows)]
+    for ply in range(0, plies + 1, 1):
+        print(f'Ply {ply}: searching {len(positions)} positions')
+        for state in positions:
+            key, mirrored = get_canonical_key(state)
+            move = solver.get_best_move(state)
+            entries[key] = cols - 1 - move if mirrored else move
+        if ply < plies:
+            positions = _get_next_positions(positions, entries)
+    makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file=file_path, mode='wb') as file_handle:
+        file_handle.write(HEADER.pack(BOOK_MAGIC, BOOK_VERSION, cols, rows, plies, len(entries)))
+        for key in sorted(entries):
+            file_handle.write(ENTRY.pack(key, entries[key]))
+    return len(entries)
+
+
+def _get_next_positions(positions: list[BitBoard], entries: dict[int, int]) -> list[BitBoard]:
+    '''All positions one move later that are neither over nor known yet.'''
+    next_positions = []
+    for state in positions:
+        for col in state.get_possible_moves():
+            if state.is_winning_move(col):
+                # the game would be over
+                continue
+            next_state = state.copy()
+            next_state.play(col)
+            next_key, _ = get_canonical_key(next_state)
+            if next_key in entries or next_state.is_full():
+                continue
+            # reserve the key, the move follows with the next ply
+            entries[next_key] = -1
+            next_positions.append(next_state)
+    return next_positions
@@ -0,0 +1,271 @@
+'''Spreads the bot search across processes.'''
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import lru_cache
+from os import cpu_count
+from threading import Event
+from time import time
+from typing import Callable
+
+from .bitboard import BitBoard
+from .solver import WIN_SCORE, Solver, get_move_order
+from .transposition import TranspositionTable
+
+# seconds reserved for sending the positions and results, at least, grows with what is measured
+RESULT_MARGIN = 0.05
+# the first moves of a depth are searched with the score of the last depth less this as alpha,
+# scores of one depth to the next differ by a window of three coins at most
+ASPIRATION = 60
+# seconds between two checks of the deadline and stop event while waiting for results
+WAIT_INTERVAL = 0.01
+# raised if processes can not be started or died, the work is done without them then
+POOL_ERRORS = (OSError, NotImplementedError, BrokenProcessPool, RuntimeError)
+
+
+def get_worker_count(workers: int) -> int:
+    '''0 means one worker per cpu.'''
+    if workers > 0:
+        return workers
+    return cpu_count() or 1
+
+
+class WorkerPool:
+    '''
+    Process pool started with the first task and started again after it broke.
+    Callers fall back to doing the work themselves if submit returns None.
+    '''
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name: str = name
+        self.workers: int = workers
+        self._executor: ProcessPoolExecutor = None
+
+    def submit(self, function: Callable, *args) -> Future | None:
+        '''Runs the function in a worker, None if there is no pool.'''
+        try:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor.submit(function, *args)
+        except POOL_ERRORS as ex:
+            self.failed(ex)
+            return None
+
+    def failed(self, ex: Exception) -> None:
+        '''Drops the broken pool, the next task starts a new one.'''
+        print(f'{self.name} not available:', ex)
+        self._executor = None
+
+    def close(self) -> None:
+        '''Stops the workers, tasks not started yet are canceled.'''
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+@lru_cache(maxsize=None)
+def get_search_pool(workers: int) -> 'SearchPool':
+    '''One pool per worker count, the processes are kept for all searches.'''
+    return SearchPool(workers=get_worker_count(workers))
+
+
+@lru_cache(maxsize=1)
+def _get_worker_table(max_memory: int) -> TranspositionTable:
+    '''Each worker process keeps its table for all searches, like a game keeps its own.'''
+    return TranspositionTable(max_memory=max_memory)
+
+
+def _search_move(history: list[int], shape: tuple[int, int], depth: int,
+                 window: tuple[int, int], limits: tuple[float, int]) -> tuple[int | None, int]:
+    '''
+    Runs in a worker process, returns the score of the last move of the history within the
+    window (alpha, beta) or None if the deadline came first, and the number of searched nodes.
+    The deadline is wall clock time, as it is shared by all processes.
+    '''
+    cols, rows = shape
+    deadline, max_memory = limits
+    state = BitBoard(cols=cols, rows=rows)
+    for col in history[:-1]:
+        state.play(col)
+    solver = Solver(time_budget=max(0.0, deadline - time()),
+                    transpositions=_get_worker_table(max_memory))
+    return solver.get_move_score(state, history[-1], depth, window), solver.nodes
+
+
+class PoolUnavailable(Exception):
+    '''Raised if a task could not be submitted or its worker died, the caller searches itself.'''
+
+
+@dataclass
+class RootSearch:
+    '''One call of get_best_move, shared by all its depths.'''
+    state: BitBoard
+    time_budget: float
+    deadline: float
+    # workers stop by then, the rest of the budget is for sending the results back
+    search_deadline: float
+    stop_event: Event = None
+
+    def is_over(self) -> bool:
+        '''True once the budget is used up or the search was stopped.'''
+        return time() >= self.deadline or \
+            self.stop_event is not None and self.stop_event.is_set()
+
+
+class SearchPool:  # pylint: disable=too-few-public-methods
+    '''
+    Searches the moves at hand in a process pool, deepening iteratively like the solver.
+    - only the root is split, each move is a task searched with the best score found so far
+      as alpha, thus worse moves fail low fast instead of being searched in full
+    - the first moves of a depth start at the score of the last depth less ASPIRATION,
+      if all moves fail low the depth is searched again with a full window
+    - ties are broken by the order of the moves, the best move of the last depth first,
+      thus the result does not depend on which worker finishes first
+    - each worker keeps its own transposition table for all searches, a move is searched by
+      the same worker at every depth if it is idle, thus its table knows the move from the last
+    The budget counts from the call, workers stop early by the time sending took in the last
+    searches. A depth not finished in time is dropped, the last finished depth counts.
+    Falls back to None if the pool is not available, the caller has to search itself then.
+    '''
+
+    def __init__(self, workers: int, max_memory: int = 16 * 1024 * 1024) -> None:
+        self.workers: int = workers
+        self.max_memory: int = max_memory
+        self.nodes: int = 0
+        self.depth: int = 0
+        # a pool of one process per worker, thus a move is searched by the same worker each depth
+        self._pools: list[WorkerPool] = [WorkerPool(name='Search pool', workers=1)
+                                         for _ in range(0, workers, 1)]
+        # seconds from the deadline of the workers until their results are back
+        self._overhead: float = RESULT_MARGIN
+
+    def get_best_move(self, state: BitBoard, time_budget: float, max_depth: int = None,
+                      stop_event: Event = None) -> int | None:
+        '''
+        Best col for the player to move or None if the pool failed.
+        Returns within the time budget, or as soon as the stop event is set.
+        '''
+        deadline = time() + time_budget
+        # at most half of the budget goes to sending
+        search = RootSearch(state=state,
+                            time_budget=time_budget,
+                            deadline=deadline,
+                            search_deadline=deadline - min(self._overhead, time_budget / 2),
+                            stop_event=stop_event)
+        self.nodes = 0
+        self.depth = 0
+        moves = [col for col in get_move_order(state.cols) if state.can_play(col)]
+        if not moves:
+            return None
+        last_depth = state.size - state.moves
+        if max_depth is not None:
+            last_depth = min(last_depth, max_depth)
+        best_move, score = moves[0], None
+        for depth in range(1, last_depth + 1, 1):
+            try:
+                result = self._search_depth(search, [best_move] + [col for col in moves
+                                                                   if col != best_move],
+                                            depth, score)
+            except PoolUnavailable:
+                return None
+            if result is None:
+                break
+            best_move, score = result
+            self.depth = depth
+            if abs(score) >= WIN_SCORE - state.size:
+                # the result is forced, deeper searches can not change it
+                break
+        return best_move
+
+    def _search_depth(self, search: RootSearch, moves: list[int], depth: int,
+                      guess: int | None) -> tuple[int, int] | None:
+        '''Best move and its score at the depth, None if the time ran out first.'''
+        floor = -WIN_SCORE * 2 if guess is None else guess - ASPIRATION
+        waiting = list(moves)
+        # move, alpha and worker of each running task
+        running: dict[Future, tuple[int, int, int]] = {}
+        # scores above the alpha they were searched with are exact
+        scores: dict[int, int] = {}
+        while waiting or running:
+            # the first move alone, its score lets the others fail low fast
+            while waiting and len(running) < (1 if len(waiting) == len(moves) - 1
+                                              else self.workers):
+                move = waiting.pop(0)
+                alpha = max([floor, *scores.values()])
+                self._submit(search, move, depth, alpha, running)
+            done = wait(running,
+                        timeout=max(0.0, min(WAIT_INTERVAL, search.deadline - time())),
+                        return_when=FIRST_COMPLETED).done
+            for future in done:
+                if not self._take_score(future, running, scores):
+                    # the worker ran into its deadline
+                    self._measure_overhead(search, late=False)
+                    self._cancel(running)
+                    return None
+            if running and search.is_over():
+                if search.stop_event is None or not search.stop_event.is_set():
+                    self._measure_overhead(search, late=True)
+                self._cancel(running)
+                return None
+        if not scores:
+            # the guess was too high, every move is worse
+            return self._search_depth(search, moves, depth, None)
+        # the first of the best moves in order
+        best_move = max((move for move in moves if move in scores), key=scores.get)
+        return best_move, scores[best_move]
+
+    def _take_score(self, future: Future, running: dict[Future, tuple[int, int, int]],
+                    scores: dict[int, int]) -> bool:
+        '''Keeps the score of the finished task if it is exact, False if it ran out of time.'''
+        move, alpha, worker = running.pop(future)
+        try:
+            score, nodes = future.result()
+        except POOL_ERRORS as ex:
+            self._pools[worker].failed(ex)
+            self._cancel(running)
+            raise PoolUnavailable() from ex
+        self.nodes += nodes
+        if score is None:
+            return False
+        if score > alpha:
+            scores[move] = score
+        return True
+
+    def _get_worker(self, move: int, running: dict[Future, tuple[int, int, int]]) -> int:
+        '''The worker that searched the move before, its table knows the move, or any idle one.'''
+        busy = {worker for _, _, worker in running.values()}
+        if move % self.workers not in busy:
+            return move % self.workers
+        return next(worker for worker in range(0, self.workers, 1) if worker not in busy)
+
+    def _submit(self, search: RootSearch, move: int, depth: int, alpha: int,
+                running: dict[Future, tuple[int, int, int]]) -> None:
+        '''Starts searching the move, preferably by the worker that searched it before.'''
+        worker = self._get_worker(move, running)
+        future = self._pools[worker].submit(_search_move,
+                                   search.state.history + [move],
+                                   (search.state.cols, search.state.rows),
+                                   depth,
+                                   (alpha, WIN_SCORE * 2),
+                                   (search.search_deadline, self.max_memory // self.workers))
+        if future is None:
+            # the caller searches itself, the workers must not keep it waiting
+            self._cancel(running)
+            raise PoolUnavailable()
+        running[future] = (move, alpha, worker)
+
+    def _cancel(self, running: dict[Future, tuple[int, int, int]]) -> None:
+        '''Tasks already running stop at the deadline of the workers.'''
+        for future in running:
+            future.cancel()
+
+    def _measure_overhead(self, search: RootSearch, late: bool) -> None:
+        '''
+        Results back after the deadline of the workers took that long to send,
+        tasks still running at the deadline need twice the margin.
+        '''
+        if late:
+            self._overhead = min(self._overhead * 2, search.time_budget / 2)
+        elif time() > search.search_deadline:
+            self._overhead = max(RESULT_MARGIN,
+                                 (self._overhead + time() - search.search_deadline) / 2)
@@ -0,0 +1,209 @@
+'''Negamax search for the strongest bot.'''
+from threading import Event
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from .bitboard import BitBoard
+from .lines import get_winning_lines
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+if TYPE_CHECKING:
+    from .parallel import SearchPool
+
+# any score above this is a forced win, below the negative a forced loss
+WIN_SCORE = 1_000_000
+# heuristic value of a window containing 1, 2 or 3 coins of only one player
+WINDOW_SCORES = (0, 1, 5, 50, 0)
+
+
+def get_move_order(cols: int) -> list[int]:
+    '''Cols sorted from the center to the sides.'''
+    center = (cols - 1) / 2
+    return sorted(range(0, cols, 1), key=lambda col: abs(col - center))
+
+
+class SearchTimeout(Exception):
+    '''Raised inside the search once the time budget is used up.'''
+
+
+class Solver:  # pylint: disable=too-many-instance-attributes
+    '''
+    Negamax search with alpha-beta pruning.
+    - cols are searched center first, as center coins are part of more windows
+    - the depth is deepened iteratively until the time budget is used up,
+      the result of the last finished depth is used
+    - positions beyond the search depth are rated by their open windows
+    - searched positions are stored in the transposition table,
+      pass the same table for all moves of a game to reuse them
+    - with a search pool the moves at hand are searched in other processes
+    '''
+
+    def __init__(self, time_budget: float = 1.0, max_depth: int = None,  # pylint: disable=too-many-arguments
+                 transpositions: TranspositionTable = None, stop_event: Event = None,
+                 pool: 'SearchPool' = None) -> None:
+        self.time_budget: float = time_budget
+        self.max_depth: int = max_depth
+        # setting the event ends the search like a timeout
+        self.stop_event: Event = stop_event
+        self.pool: SearchPool = pool
+        self.transpositions: TranspositionTable = transpositions
+        if self.transpositions is None:
+            self.transpositions = TranspositionTable()
+        self.nodes: int = 0
+        self.depth: int = 0
+        self._deadline: float = 0
+        self._order: list[int] = []
+        self._window_masks: tuple[int, ...] = ()
+
+    def _prepare_search(self, state: BitBoard) -> None:
+        self._deadline = perf_counter() + self.time_budget
+        self.nodes = 0
+        self.depth = 0
+        self._order = get_move_order(state.cols)
+        self._window_masks = get_winning_lines(cols=state.cols,
+                                               rows=state.rows).window_masks
+        self.transpositions.new_search()
+
+    def _get_max_depth(self, state: BitBoard) -> int:
+        max_depth = state.size - state.moves
+        if self.max_depth is not None:
+            max_depth = min(max_depth, self.max_depth)
+        return max_depth
+
+    def get_best_move(self, state: BitBoard) -> int:
+        '''Searches the best col for the player to move. The given state is not changed.'''
+        self._prepare_search(state)
+        possible_moves = [col for col in self._order if state.can_play(col)]
+        for move in possible_moves:
+            if state.is_winning_move(move):
+                return move
+        if self.pool is not None:
+            move = self.pool.get_best_move(state=state,
+                                           time_budget=self.time_budget,
+                                           max_depth=self.max_depth,
+                                           stop_event=self.stop_event)
+            if move is not None:
+                self.nodes = self.pool.nodes
+                self.depth = self.pool.depth
+                return move
+            # the pool is not available, search in this process with the remaining time
+        # search on a copy, a timeout leaves coins on the searched state
+        state = state.copy()
+        best_move = possible_moves[0]
+        for depth in range(1, self._get_max_depth(state) + 1, 1):
+            try:
+                move, score = self._search_root(state, depth, best_move)
+            except SearchTimeout:
+                break
+            best_move = move
+            self.depth = depth
+            if abs(score) >= WIN_SCORE - state.size:
+                # the result is forced, deeper searches can not change it
+                break
+        return best_move
+
+    def get_move_score(self, state: BitBoard, move: int, depth: int,
+                       window: tuple[int, int]) -> int | None:
+        '''
+        Score of the move for the player to move, searched to the depth.
+        Exact within the window (alpha, beta), at most alpha or at least beta outside of it.
+        None if the time budget ran out first. The given state is not changed.
+        '''
+        self._prepare_search(state)
+        alpha, beta = window
+        state = state.copy()
+        state.play(move)
+        try:
+            score = -self._negamax(state, depth - 1, -beta, -alpha)
+        except SearchTimeout:
+            return None
+        self.depth = depth
+        return score
+
+    def _search_root(self, state: BitBoard, depth: int, first_move: int) -> tuple[int, int]:
+        '''Searches all moves, starting with the best move of the previous depth.'''
+        moves = [first_move] + [col for col in self._order
+                                if col != first_move and state.can_play(col)]
+        best_move = first_move
+        best_score = -WIN_SCORE * 2
+        alpha = -WIN_SCORE * 2
+        for move in moves:
+            state.play(move)
+            score = -self._negamax(state, depth - 1, -WIN_SCORE * 2, -alpha)
+            state.undo()
+            if score > best_score:
+                best_move = move
+                best_score = score
+            alpha = max(alpha, score)
+        return best_move, best_score
+
+    def _negamax(self, state: BitBoard, depth: int,  # pylint: disable=too-many-branches,too-many-return-statements,too-many-locals
+                 alpha: int, beta: int) -> int:
+        '''
+        Score of the position for the player to move.
+        Kept in one function as it runs for every node.
+        '''
+        self.nodes += 1
+        if self.nodes & 255 == 0 and (perf_counter() > self._deadline or
+                                      self.stop_event is not None and self.stop_event.is_set()):
+            raise SearchTimeout()
+        if state.is_full():
+            return 0
+        for col in self._order:
+            if state.can_play(col) and state.is_winning_move(col):
+                # earlier wins are better
+                return WIN_SCORE - state.moves - 1
+        if depth == 0:
+            return self._evaluate(state)
+        key = state.key()
+        order = self._order
+        entry = self.transpositions.get(key)
+        if entry is not None:
+            entry_depth, entry_score, entry_bound, entry_move = entry
+            if entry_depth >= depth:
+                if entry_bound == EXACT:
+                    return entry_score
+                if entry_bound == LOWER and entry_score >= beta:
+                    return entry_score
+                if entry_bound == UPPER and entry_score <= alpha:
+                    return entry_score
+            # the best move of an earlier search is likely still the best
+            order = [entry_move] + [col for col in order if col != entry_move]
+        original_alpha = alpha
+        best_score = -WIN_SCORE * 2
+        best_move = order[0]
+        for col in order:
+            if not state.can_play(col):
+                continue
+            state.play(col)
+            score = -self._negamax(state, depth - 1, -beta, -alpha)
+            state.undo()
+            if score > best_score:
+                best_score = score
+                best_move = col
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        bound = EXACT
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        self.transpositions.put(key, depth, best_score, bound, best_move)
+        return best_score
+
+    def _evaluate(self, state: BitBoard) -> int:
+        '''Rates open windows, windows blocked by both players are worth nothing.'''
+        own = state.position
+        other = state.position ^ state.mask
+        score = 0
+        for window in self._window_masks:
+            own_coins = own & window
+            other_coins = other & window
+            if own_coins and other_coins:
+                continue
+            if own_coins:
+                score += WINDOW_SCORES[own_coins.bit_count()]
+            elif other_coins:
+                score -= WINDOW_SCORES[other_coins.bit_count()]
+        return score
@@ -0,0 +1,131 @@
+'''Transposition table to remember searched positions.'''
+from array import array
+
+# keys are stored in words of this many bits, low word first
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+# 2^64 divided by the golden ratio, multiplying by it spreads every key bit over the high bits
+FIBONACCI = 0x9E3779B97F4A7C15
+# bound types of a stored score
+EXACT = 0
+# the real score is at least the stored score
+LOWER = 1
+# the real score is at most the stored score
+UPPER = 2
+
+
+class TranspositionTable:  # pylint: disable=too-many-instance-attributes
+    '''
+    Fixed size table of searched positions, preallocated up to the memory cap.
+    Each field lives in its own array, the size is a power of two.
+
+    Keys are derived from the bitboard (position + mask), which is unique for each position.
+    The slot are the high bits of the key times FIBONACCI, thus every col decides the slot,
+    not only the cols in the low bits. Keys above 64 bits are folded into 64 bits first.
+    Keys are stored whole, split into 64 bit words, thus two positions never share an entry.
+    Boards with keys above 64 bits (cols * (rows + 1)) need more words per entry,
+    the table is allocated again with fewer entries when the first such key is stored.
+
+    A slot is replaced if it is empty, holds the same position,
+    stems from an older search or was searched less deep (depth preferred).
+    '''
+    # score, depth, bound, best move and age, plus 8 bytes per word of the key
+    ENTRY_SIZE = 4 + 1 + 1 + 1 + 1
+
+    def __init__(self, max_memory: int = 16 * 1024 * 1024) -> None:
+        self.max_memory: int = max_memory
+        self.size: int = 1
+        self.probes: int = 0
+        self.hits: int = 0
+        self._age: int = 0
+        # bits of the slot index, the high bits of the mixed key
+        self._shift: int = WORD_BITS
+        # one array per word of the keys
+        self._keys: list[array] = [array('Q')]
+        self._scores: array = None
+        self._depths: array = None
+        self._bounds: array = None
+        self._moves: array = None
+        self._ages: array = None
+        self.clear()
+
+    def clear(self) -> None:
+        '''Forgets all positions.'''
+        entry_size = self.ENTRY_SIZE + 8 * len(self._keys)
+        bits = max(1, self.max_memory // entry_size).bit_length() - 1
+        self.size = 1 << bits
+        self._shift = WORD_BITS - bits
+        self._keys = [array('Q', bytes(8 * self.size)) for _ in self._keys]
+        self._scores = array('i', bytes(4 * self.size))
+        # depth -1 marks an empty slot
+        self._depths = array('b', [-1]) * self.size
+        self._bounds = array('b', bytes(self.size))
+        self._moves = array('b', bytes(self.size))
+        self._ages = array('B', bytes(self.size))
+        self._age = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self) -> None:
+        '''Marks all stored entries as old, so they are replaced first.'''
+        self._age = (self._age + 1) % 256
+
+    def get(self, key: int) -> tuple[int, int, int, int] | None:
+        '''Returns depth, score, bound and best move of the position or None.'''
+        index = self.get_index(key)
+        self.probes += 1
+        if self._depths[index] == -1 or not self._matches(index, key):
+            return None
+        self.hits += 1
+        return (self._depths[index], self._scores[index],
+                self._bounds[index], self._moves[index])
+
+    def put(self, key: int, depth: int, score: int, bound: int, move: int) -> None:
+        '''Stores a searched position if the replacement policy allows it.'''
+        if key >> (WORD_BITS * len(self._keys)):
+            # the first key of a larger board, fewer entries fit with more words each
+            while key >> (WORD_BITS * len(self._keys)):
+                self._keys.append(array('Q'))
+            self.clear()
+        index = self.get_index(key)
+        if self._depths[index] != -1 \
+                and not self._matches(index, key) \
+                and self._ages[index] == self._age \
+                and self._depths[index] > depth:
+            return
+        self._store_key(index, key)
+        self._scores[index] = score
+        self._depths[index] = min(depth, 127)
+        self._bounds[index] = bound
+        self._moves[index] = move
+        self._ages[index] = self._age
+
+    def _matches(self, index: int, key: int) -> bool:
+        '''True if the slot holds the key, word by word.'''
+        for keys in self._keys:
+            if keys[index] != key & WORD_MASK:
+                return False
+            key >>= WORD_BITS
+        # more words than stored
+        return not key
+
+    def get_index(self, key: int) -> int:
+        '''Slot of the key.'''
+        if key > WORD_MASK:
+            folded = 0
+            while key:
+                folded ^= key & WORD_MASK
+                key >>= WORD_BITS
+            key = folded
+        return ((key * FIBONACCI) & WORD_MASK) >> self._shift
+
+    def _store_key(self, index: int, key: int) -> None:
+        for keys in self._keys:
+            keys[index] = key & WORD_MASK
+            key >>= WORD_BITS
+
+    def hit_rate(self) -> float:
+        '''Share of probes that found their position.'''
+        if not self.probes:
+            return 0.0
+        return self.hits / self.probes
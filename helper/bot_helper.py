@@ -1,12 +1,21 @@
 '''Helper functions that regulate bot behaviour.'''
 import random
+from math import inf
+from threading import Event
 
-from assets import Difficulty
-from components import Board
-from helper import board_helper as BoardHelper
+from engine import (BitBoard, Difficulty, SearchPool, Solver,
+                    TranspositionTable, get_opening_book)
+from helper.metrics_helper import (COUNT_BUCKETS, RATE_BUCKETS, MetricsRegistry,
+                                   NullRegistry)
 
+# upper bounds of the buckets for the depth the perfect bot finished
+DEPTH_BUCKETS = (1, 2, 4, 6, 8, 10, 12, 14, 16, 20, 24, 32, 42, inf)
 
-def calculate_next_move(difficulty: int, board: Board, possible_moves: list[int]) -> int:
+
+def calculate_next_move(difficulty: int, state: BitBoard, *,  # pylint: disable=too-many-arguments
+                        time_budget: float = 1.0, transpositions: TranspositionTable = None,
+                        stop_event: Event = None, pool: SearchPool = None,
+                        metrics: MetricsRegistry = None) -> int:
     '''
     - Easy just throws random.
       Therefore easy will likely loose.
@@ -22,75 +31,86 @@ def calculate_next_move(difficulty: int, board: Board, possible_moves: list[int]
     - Extreme difficulty moves are:
         - same as hard
         - not dropping coins where the player could win next turn
+    - Perfect difficulty searches as many moves ahead as the time budget allows.
+      Pass the same transpositions for a whole game to keep known positions.
+      Early moves are taken from the opening book without searching.
+      Setting the stop_event ends the search early with the best move found so far.
+      With a pool the search is spread across its processes.
+      Searched nodes, depth and table hit rate are recorded to the metrics.
     '''
+    if difficulty >= Difficulty.PERFECT.value:
+        solver = Solver(time_budget=time_budget,
+                        transpositions=transpositions,
+                        stop_event=stop_event,
+                        pool=pool)
+        return _calculate_perfect_move(state=state,
+                                       solver=solver,
+                                       metrics=metrics or NullRegistry())
+    possible_moves = state.get_possible_moves()
+    bot = state.current_player
+    opponent = 2 if bot == 1 else 1
     if difficulty >= Difficulty.HARD.value:
         # try to win
         for move in possible_moves:
-            if _move_as(board=board,
+            if _move_as(state=state,
                         move=move,
-                        player=2):
+                        player=bot):
                 return move
     if difficulty >= Difficulty.EXTREME.value:
         # make safe moves
         safe_moves = []
         for move in possible_moves:
-            if _move_is_safe(board, move):
+            if _move_is_safe(state, move):
                 safe_moves.append(move)
         for move in safe_moves:
-            if _move_as(board=board,
+            if _move_as(state=state,
                         move=move,
-                        player=1):
+                        player=opponent):
                 return move
-        return random.choice(safe_moves)
+        # every move may help the player, any move is as good as the other
+        return random.choice(safe_moves or possible_moves)
     if difficulty >= Difficulty.MEDIUM.value:
         for move in possible_moves:
             # prevent win
-            if _move_as(board=board,
+            if _move_as(state=state,
                         move=move,
-                        player=1):
+                        player=opponent):
                 return move
     return random.choice(possible_moves)
 
 
-def _move_is_safe(board: Board, move: int) -> bool:
-    abstract_board = board.get_abstract_board()
-    affected_cells = BoardHelper.get_cells_in_col(abstract_board, move)
-    affected_cells.reverse()
-    for cell in affected_cells:
-        if cell.is_empty():
-            cell.current_player = 2
-            break
-    if BoardHelper.has_connected_four(board_cells=abstract_board,
-                                      cols=board.cols,
-                                      rows=board.rows):
-        return True
-    if BoardHelper.board_is_full(abstract_board):
-        return True
-    for cell in affected_cells:
-        if cell.is_empty():
-            cell.current_player = 1
-            break
-    if BoardHelper.has_connected_four(board_cells=abstract_board,
-                                      cols=board.cols,
-                                      rows=board.rows):
-        return False
-    if BoardHelper.board_is_full(abstract_board):
-        return True
-    return True
+def _calculate_perfect_move(state: BitBoard, solver: Solver, metrics: MetricsRegistry) -> int:
+    book_move = get_opening_book(cols=state.cols,
+                                 rows=state.rows).get_move(state)
+    if book_move is not None and state.can_play(book_move):
+        metrics.counter('bot_book_moves').inc()
+        return book_move
+    probes = solver.transpositions.probes
+    hits = solver.transpositions.hits
+    move = solver.get_best_move(state)
+    metrics.histogram('bot_nodes', COUNT_BUCKETS).observe(solver.nodes)
+    metrics.histogram('bot_depth', DEPTH_BUCKETS).observe(solver.depth)
+    metrics.counter('bot_searched_moves').inc()
+    if solver.transpositions.probes > probes:
+        hit_rate = (solver.transpositions.hits - hits) / (solver.transpositions.probes - probes)
+        metrics.histogram('bot_table_hit_rate', RATE_BUCKETS).observe(hit_rate)
+    return move
+
+
+def _move_is_safe(state: BitBoard, move: int) -> bool:
+    '''True if the other player can not win by dropping on top of the move.'''
+    state.play(move)
+    safe = True
+    if not state.last_move_won() and not state.is_full():
+        safe = not (state.can_play(move) and state.is_winning_move(move))
+    state.undo()
+    return safe
 
 
-def _move_as(board: Board, move: int, player: int) -> bool:
-    abstract_board = board.get_abstract_board()
-    affected_cells = BoardHelper.get_cells_in_col(abstract_board, move)
-    affected_cells.reverse()
-    for cell in affected_cells:
-        if cell.is_empty():
-            cell.current_player = player
-            break
-    if BoardHelper.has_connected_four(board_cells=abstract_board,
-                                      cols=board.cols,
-                                      rows=board.rows):
+def _move_as(state: BitBoard, move: int, player: int) -> bool:
+    '''True if the move would end the game for the player, either by winning or a draw.'''
+    if state.is_winning_move(move, player=player):
         return True
-    if BoardHelper.board_is_full(abstract_board):
+    if state.moves + 1 == state.size:
         return True
     return False
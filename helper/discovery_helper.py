@@ -0,0 +1,167 @@
+'''Finds hosted games on the local network by udp broadcasts.'''
+import asyncio
+import socket
+from dataclasses import dataclass
+from random import uniform
+from threading import Lock
+from time import monotonic
+from typing import Callable
+
+from helper.protocol_helper import (Message, MessageReader, MessageType,
+                                    MessageWriter, ProtocolError)
+
+# udp port every game listens on for announcements
+DISCOVERY_PORT = 51232
+BROADCAST = '255.255.255.255'
+# seconds between two announcements of a host, varied by the jitter to not send in lockstep
+ANNOUNCE_INTERVAL = 1.0
+ANNOUNCE_JITTER = 0.2
+# a game not announced again within this many seconds is gone
+GAME_TTL = 3.5
+# more games are ignored until known ones are gone
+MAX_GAMES = 32
+# seconds between two pings of the same game
+PING_INTERVAL = 2.0
+
+
+@dataclass
+class DiscoveredGame:
+    '''A hosted game seen on the network, ping is None until answered.'''
+    ip: str
+    port: int
+    cols: int
+    rows: int
+    playing: bool
+    seen: float
+    ping: float = None
+
+
+def _read_datagram(data: bytes) -> list[Message]:
+    '''A datagram holds whole messages, anything else is ignored.'''
+    try:
+        return MessageReader().feed(data)
+    except ProtocolError:
+        return []
+
+
+class _AnnounceProtocol(asyncio.DatagramProtocol):
+    '''Answers pings of games that received the announcement.'''
+
+    def __init__(self) -> None:
+        self.transport: asyncio.DatagramTransport = None
+        self.messages: MessageWriter = MessageWriter()
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        for message in _read_datagram(data):
+            if message.type == MessageType.HEARTBEAT and not message.values[0]:
+                self.transport.sendto(self.messages.write(MessageType.HEARTBEAT,
+                                                          True, message.values[1]), addr)
+
+    def error_received(self, exc: Exception) -> None:
+        # e.g. no network to broadcast to, the next announcement tries again
+        pass
+
+
+async def announce(port: int, cols: int, rows: int, playing: Callable[[], bool], *,
+                   target: tuple[str, int] = (BROADCAST, DISCOVERY_PORT)) -> None:
+    '''Announces the game hosted on port to the target about once a second until canceled.'''
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_AnnounceProtocol,
+                                                              local_addr=('0.0.0.0', 0),
+                                                              allow_broadcast=True)
+    try:
+        while True:
+            data = protocol.messages.write(MessageType.ANNOUNCE, port, cols, rows, playing())
+            transport.sendto(data, target)
+            await asyncio.sleep(ANNOUNCE_INTERVAL * uniform(1 - ANNOUNCE_JITTER,
+                                                            1 + ANNOUNCE_JITTER))
+    finally:
+        transport.close()
+
+
+class Discovery(asyncio.DatagramProtocol):
+    '''
+    Collects announced games while listen runs, get_games can be called from any thread.
+    - every game on a computer can listen at once, the port is shared
+    - a game is pinged at most every PING_INTERVAL, the ping is the time until its answer,
+      pings are sent from a port of their own, the answer would go to any listener otherwise
+    - at most MAX_GAMES are kept, each for GAME_TTL after its last announcement
+    '''
+
+    def __init__(self, discovery_port: int = DISCOVERY_PORT) -> None:
+        self.discovery_port: int = discovery_port
+        self._games: dict[tuple[str, int], DiscoveredGame] = {}
+        # announcing address -> (ip, port) of the game and when it was pinged
+        self._pinged: dict[tuple, tuple[tuple[str, int], float]] = {}
+        self._lock = Lock()
+        self._transport: asyncio.DatagramTransport = None
+        self._messages: MessageWriter = MessageWriter()
+
+    async def listen(self) -> None:
+        '''Listens for announcements until canceled.'''
+        loop = asyncio.get_running_loop()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, 'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(('', self.discovery_port))
+        transport, _ = await loop.create_datagram_endpoint(lambda: self, sock=sock)
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: self,
+                                                                 local_addr=('0.0.0.0', 0))
+        try:
+            await asyncio.Future()
+        finally:
+            transport.close()
+            self._transport.close()
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        for message in _read_datagram(data):
+            if message.type == MessageType.ANNOUNCE:
+                self._announced(message, addr)
+            elif message.type == MessageType.HEARTBEAT and message.values[0]:
+                self._answered(message, addr)
+
+    def _announced(self, message: Message, addr: tuple) -> None:
+        port, cols, rows, playing = message.values
+        key = (addr[0], port)
+        now = monotonic()
+        with self._lock:
+            self._remove_expired(now)
+            game = self._games.get(key)
+            if game is None:
+                if len(self._games) >= MAX_GAMES:
+                    return
+                game = DiscoveredGame(ip=addr[0], port=port, cols=cols, rows=rows,
+                                      playing=playing, seen=now)
+                self._games[key] = game
+            game.playing = playing
+            game.seen = now
+            pinged = self._pinged.get(addr)
+            if pinged and now - pinged[1] < PING_INTERVAL:
+                return
+            self._pinged[addr] = (key, now)
+        self._transport.sendto(self._messages.write(MessageType.HEARTBEAT, False, now), addr)
+
+    def _answered(self, message: Message, addr: tuple) -> None:
+        with self._lock:
+            if addr not in self._pinged:
+                return
+            key, _ = self._pinged[addr]
+            if key in self._games:
+                self._games[key].ping = monotonic() - message.values[1]
+
+    def _remove_expired(self, now: float) -> None:
+        for key in [key for key, game in self._games.items() if now - game.seen > GAME_TTL]:
+            del self._games[key]
+        for addr in [addr for addr, (key, _) in self._pinged.items() if key not in self._games]:
+            del self._pinged[addr]
+
+    def get_games(self) -> list[DiscoveredGame]:
+        '''Games announced within the last GAME_TTL seconds, by ip and port.'''
+        with self._lock:
+            self._remove_expired(monotonic())
+            return sorted((DiscoveredGame(**vars(game)) for game in self._games.values()),
+                          key=lambda game: (game.ip, game.port))
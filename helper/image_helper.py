@@ -0,0 +1,165 @@
+'''Reads, scales and writes png images without tkinter, thus it can run in another process.'''
+import struct
+import zlib
+from functools import lru_cache
+from os import makedirs, path, replace
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# color types of 8 bit pngs that can be read and their bytes per pixel
+CHANNELS = {2: 3, 6: 4}
+
+
+@lru_cache(maxsize=None)
+def get_png_size(file_path: str) -> tuple[int, int]:
+    '''Width and height from the header, without reading the image.'''
+    with open(file=file_path, mode='rb') as file_handle:
+        header = file_handle.read(24)
+    if header[:8] != PNG_SIGNATURE:
+        raise ValueError(f'{file_path} is not a png!')
+    return struct.unpack('>II', header[16:24])
+
+
+def _paeth(left: int, up: int, up_left: int) -> int:
+    estimate = left + up - up_left
+    distance_left = abs(estimate - left)
+    distance_up = abs(estimate - up)
+    distance_up_left = abs(estimate - up_left)
+    if distance_left <= distance_up and distance_left <= distance_up_left:
+        return left
+    if distance_up <= distance_up_left:
+        return up
+    return up_left
+
+
+def _unfilter(row: bytearray, previous: bytearray, filter_type: int, channels: int) -> None:
+    '''Reverts the filter of a row in place, previous is the row above, already reverted.'''
+    match filter_type:
+        case 0:
+            return
+        case 1:
+            for index in range(channels, len(row)):
+                row[index] = (row[index] + row[index - channels]) & 0xFF
+        case 2:
+            for index, up in enumerate(previous):
+                row[index] = (row[index] + up) & 0xFF
+        case 3:
+            for index, up in enumerate(previous):
+                left = row[index - channels] if index >= channels else 0
+                row[index] = (row[index] + (left + up) // 2) & 0xFF
+        case 4:
+            for index, up in enumerate(previous):
+                if index >= channels:
+                    paeth = _paeth(row[index - channels], up, previous[index - channels])
+                else:
+                    paeth = up
+                row[index] = (row[index] + paeth) & 0xFF
+        case _:
+            raise ValueError(f'Unknown png filter {filter_type}!')
+
+
+def _read_chunks(data: bytes) -> tuple[tuple, bytes]:
+    '''The header values and the compressed image data.'''
+    header: tuple = None
+    compressed: list[bytes] = []
+    position = len(PNG_SIGNATURE)
+    while position < len(data):
+        length, chunk_type = struct.unpack_from('>I4s', data, position)
+        chunk = data[position + 8:position + 8 + length]
+        # length, type and crc around the data
+        position += length + 12
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif chunk_type == b'IDAT':
+            compressed.append(chunk)
+        elif chunk_type == b'IEND':
+            break
+    return header, b''.join(compressed)
+
+
+def read_png(file_path: str) -> tuple[int, int, bytearray]:
+    '''Width, height and the rgba pixels row by row of an 8 bit rgb(a) png.'''
+    with open(file=file_path, mode='rb') as file_handle:
+        data = file_handle.read()
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError(f'{file_path} is not a png!')
+    header, compressed = _read_chunks(data)
+    width, height, depth, color_type, _, _, interlace = header
+    if depth != 8 or color_type not in CHANNELS or interlace:
+        raise ValueError(f'{file_path} is no 8 bit rgb(a) png without interlacing!')
+    return width, height, _decode_pixels(zlib.decompress(compressed), width, height,
+                                         CHANNELS[color_type])
+
+
+def _decode_pixels(raw: bytes, width: int, height: int, channels: int) -> bytearray:
+    '''Reverts the filters row by row, rgb gets an opaque alpha channel.'''
+    stride = width * channels
+    pixels = bytearray()
+    previous = bytearray(stride)
+    for row_index in range(0, height, 1):
+        start = row_index * (stride + 1)
+        row = bytearray(raw[start + 1:start + 1 + stride])
+        _unfilter(row, previous, raw[start], channels)
+        pixels += row
+        previous = row
+    if channels == 3:
+        rgba = bytearray(b'\xff' * width * height * 4)
+        for channel in range(0, 3, 1):
+            rgba[channel::4] = pixels[channel::3]
+        pixels = rgba
+    return pixels
+
+
+def write_png(file_path: str, width: int, height: int, pixels: bytes) -> None:
+    '''Writes rgba pixels, the file appears only once it is complete.'''
+    stride = width * 4
+    raw = b''.join(b'\x00' + bytes(pixels[start:start + stride])
+                   for start in range(0, height * stride, stride))
+
+    def get_chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + chunk_type + data +
+                struct.pack('>I', zlib.crc32(chunk_type + data)))
+
+    makedirs(path.dirname(file_path), exist_ok=True)
+    temporary_path = file_path + '.tmp'
+    with open(file=temporary_path, mode='wb') as file_handle:
+        # 8 bit rgba, no interlacing
+        header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+        file_handle.write(PNG_SIGNATURE +
+                          get_chunk(b'IHDR', header) +
+                          get_chunk(b'IDAT', zlib.compress(raw, 6)) +
+                          get_chunk(b'IEND', b''))
+    replace(temporary_path, file_path)
+
+
+def _get_spans(source: int, target: int) -> list[tuple[int, int]]:
+    '''Source pixels [start, end) averaged into each target pixel, a single one when enlarging.'''
+    spans = []
+    for index in range(0, target, 1):
+        start = index * source // target
+        spans.append((start, max(start + 1, (index + 1) * source // target)))
+    return spans
+
+
+def scale_pixels(width: int, height: int, pixels: bytes,
+                 new_width: int, new_height: int) -> bytearray:
+    '''Scales rgba pixels by averaging the source pixels covered by each new pixel.'''
+    stride = width * 4
+    cols = _get_spans(width, new_width)
+    rows: list[list[int]] = []
+    for row_start in range(0, height * stride, stride):
+        row = pixels[row_start:row_start + stride]
+        rows.append([sum(row[start * 4 + channel:end * 4:4]) // (end - start)
+                     for start, end in cols
+                     for channel in range(0, 4, 1)])
+    scaled = bytearray()
+    for start, end in _get_spans(height, new_height):
+        scaled += bytes(sum(values) // (end - start) for values in zip(*rows[start:end]))
+    return scaled
+
+
+def scale_png(source_path: str, target_path: str, width: int, height: int) -> str:
+    '''Writes the source scaled to width and height to the target, returns the target.'''
+    source_width, source_height, pixels = read_png(source_path)
+    write_png(target_path, width, height,
+              scale_pixels(source_width, source_height, pixels, width, height))
+    return target_path
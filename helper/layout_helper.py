@@ -0,0 +1,46 @@
+'''Sizes of fonts, buttons and images for any window size, computed once per size.'''
+from dataclasses import dataclass
+from functools import lru_cache
+
+# cols of the board, the cells are as wide as the window divided by them
+BOARD_COLS = 7
+# fonts never get smaller than this, whatever the window size
+MIN_FONT_SIZE = 8
+
+
+@dataclass(frozen=True)
+class Layout:
+    '''Everything the menus and resources scale with the window.'''
+    font_size: int
+    small_font_size: int
+    button_width: int
+    button_height: int
+    button_margin_x: float
+    button_margin_y: int
+    cell_size: int
+
+
+@lru_cache(maxsize=None)
+def get_layout(width: int, height: int) -> Layout:
+    '''
+    The layout of a window of width x height.
+    Matches the hand made sizes of 500 and 700 pixels, anything in between or beyond follows them.
+    '''
+    size = min(width, height)
+    button_height = height // 7
+    return Layout(font_size=max(MIN_FONT_SIZE, round(size / 20) + 2),
+                  small_font_size=max(MIN_FONT_SIZE, round(size / 20) - 4),
+                  button_width=width * 4 // 7,
+                  button_height=button_height,
+                  button_margin_x=width / 4.6,
+                  button_margin_y=button_height // 2,
+                  cell_size=width // BOARD_COLS)
+
+
+@lru_cache(maxsize=None)
+def get_image_size(group: str, width: int, height: int) -> tuple[int, int]:
+    '''Size the images of the group are shown in: the background fills the window, cells one col.'''
+    if group == 'main':
+        return width, height
+    cell_size = get_layout(width, height).cell_size
+    return cell_size, cell_size
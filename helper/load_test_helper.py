@@ -0,0 +1,102 @@
+'''Simulated players to measure how many games a server keeps up with.'''
+import asyncio
+import random
+from time import perf_counter
+
+from engine import GameState
+from helper.metrics_helper import get_percentile
+from helper.protocol_helper import MessageReader, MessageType, MessageWriter
+
+
+class SimulatedPlayer:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    '''Waits for a match and drops coins at random as soon as it is its turn.'''
+
+    def __init__(self, games: int, shape: tuple[int, int], seed: int) -> None:
+        self.games: int = games
+        self.shape: tuple[int, int] = shape
+        self.finished: int = 0
+        self.moves: int = 0
+        # seconds from sending a move until the opponent's move arrived
+        self.round_trips: list[float] = []
+        self._random = random.Random(seed)
+        self._messages: MessageWriter = MessageWriter()
+        self._writer: asyncio.StreamWriter = None
+        self._game: GameState = None
+        self._player: int = -1
+        self._sent_at: float = None
+
+    async def play(self, host: str, port: int) -> None:
+        '''Plays the given number of games, then disconnects.'''
+        reader, self._writer = await asyncio.open_connection(host, port)
+        self._send(MessageType.HANDSHAKE, *self.shape)
+        messages = MessageReader()
+        try:
+            while self.finished < self.games and (data := await reader.read(4096)):
+                for message in messages.feed(data):
+                    match message.type:
+                        case MessageType.MATCH:
+                            self._game = GameState(*self.shape)
+                            self._player = message.values[0]
+                            self._move()
+                        case MessageType.MOVE:
+                            if self._sent_at is not None:
+                                self.round_trips.append(perf_counter() - self._sent_at)
+                                self._sent_at = None
+                            self._game.play(message.values[0])
+                            self._move()
+                        case MessageType.SYNC:
+                            self._game = GameState(*self.shape)
+                            for col in message.values[3:]:
+                                self._game.play(col)
+                            self._move()
+                        case MessageType.RESIGN:
+                            # the opponent is done, so is this player
+                            self.finished = self.games
+        finally:
+            self._writer.close()
+
+    def _send(self, message_type: MessageType, *values) -> None:
+        self._writer.write(self._messages.write(message_type, *values))
+
+    def _move(self) -> None:
+        '''Moves if it is this player's turn, asks for a rematch once the game is over.'''
+        if self._game.is_over():
+            self.finished += 1
+            if self.finished < self.games:
+                self._send(MessageType.REMATCH, True)
+            return
+        if self._game.current_player != self._player:
+            return
+        col = self._random.choice(self._game.get_possible_moves())
+        self._send(MessageType.MOVE, col, self._game.board.moves)
+        self._game.play(col)
+        self.moves += 1
+        self._sent_at = perf_counter()
+        if self._game.is_over():
+            self._move()
+
+
+async def run_load_test(host: str, port: int, players: int, games: int,  # pylint: disable=too-many-arguments
+                        *, shape: tuple[int, int] = (7, 6), seed: int = 0) -> dict:
+    '''Lets all players play at once and sums up throughput and round trips.'''
+    simulated = [SimulatedPlayer(games=games, shape=shape, seed=seed + index)
+                 for index in range(0, players, 1)]
+    start = perf_counter()
+    results = await asyncio.gather(*[player.play(host, port) for player in simulated],
+                                   return_exceptions=True)
+    duration = perf_counter() - start
+    errors = [result for result in results if isinstance(result, Exception)]
+    round_trips = [round_trip for player in simulated for round_trip in player.round_trips]
+    moves = sum(player.moves for player in simulated)
+    return {
+        'players': players,
+        'errors': len(errors),
+        # both players of a game count it
+        'games': sum(player.finished for player in simulated) // 2,
+        'moves': moves,
+        'duration': duration,
+        'moves_per_second': moves / duration if duration else 0,
+        'round_trip_p50_ms': get_percentile(round_trips, 0.5) * 1000,
+        'round_trip_p95_ms': get_percentile(round_trips, 0.95) * 1000,
+        'round_trip_p99_ms': get_percentile(round_trips, 0.99) * 1000
+    }
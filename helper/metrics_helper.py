@@ -0,0 +1,209 @@
+'''Counters and histograms to see how long moves and frames take while playing.'''
+import json
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import inf
+from threading import Lock, Thread
+
+# upper bounds of the buckets in seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, inf)
+# upper bounds of the buckets for searched positions
+COUNT_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, inf)
+# upper bounds of the buckets for rates between 0 and 1
+RATE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+def get_percentile(samples: list[float], percentile: float) -> float:
+    '''Exact percentile of raw samples by nearest rank, 0 without samples.'''
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percentile))]
+
+
+class Counter:
+    '''Counts up, never down.'''
+
+    def __init__(self) -> None:
+        self.value: int = 0
+        self._lock = Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        '''Adds the amount.'''
+        with self._lock:
+            self.value += amount
+
+    def to_dict(self) -> dict:
+        '''Plain values to dump as json.'''
+        return {'type': 'counter', 'value': self.value}
+
+
+class Histogram:
+    '''
+    Counts observations per bucket, thus it never grows no matter how long the game runs.
+    Percentiles are the upper bound of the bucket they fall into,
+    except for the last bucket which reports the largest observation.
+    '''
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets: tuple[float, ...] = buckets
+        self.counts: list[int] = [0] * len(buckets)
+        self.count: int = 0
+        self.sum: float = 0
+        self.max: float = 0
+        self._lock = Lock()
+
+    def observe(self, value: float) -> None:
+        '''Adds one observation.'''
+        index = min(bisect_left(self.buckets, value), len(self.buckets) - 1)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+
+    def get_percentile(self, percentile: float) -> float:
+        '''0 until something was observed.'''
+        rank = percentile * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.buckets[index], self.max)
+        return 0
+
+    def to_dict(self) -> dict:
+        '''Plain values to dump as json.'''
+        with self._lock:
+            return {
+                'type': 'histogram',
+                'count': self.count,
+                'sum': self.sum,
+                'max': self.max,
+                'p50': self.get_percentile(0.5),
+                'p95': self.get_percentile(0.95),
+                'p99': self.get_percentile(0.99),
+                'buckets': {str(bound): count for bound, count
+                            in zip(self.buckets, self.counts)}
+            }
+
+
+class MetricsRegistry:
+    '''
+    Holds all metrics by name, the same name always returns the same metric.
+    Metrics can be written to a json file or fetched from http://127.0.0.1:<port>/metrics.
+    '''
+
+    enabled: bool = True
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = Lock()
+        self._server: ThreadingHTTPServer = None
+
+    def counter(self, name: str) -> Counter:
+        '''Counter of the given name, created on first use.'''
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter()
+            return self._metrics[name]
+
+    def histogram(self, name: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        '''Histogram of the given name, created with the buckets on first use.'''
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(buckets)
+            return self._metrics[name]
+
+    def to_dict(self) -> dict:
+        '''All metrics sorted by name.'''
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        return {name: metric.to_dict() for name, metric in metrics}
+
+    def dump(self, file_path: str) -> bool:
+        '''Writes all metrics to the file.'''
+        try:
+            with open(file=file_path, mode='w', encoding='utf-8') as file_handle:
+                json.dump(self.to_dict(), file_handle, indent=4)
+            return True
+        except OSError as ex:
+            print('Failed to save metrics:', ex)
+            return False
+
+    def serve(self, port: int) -> bool:
+        '''Answers GET /metrics on localhost in a background thread.'''
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            '''Returns the metrics as json.'''
+
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                '''Called by the server for every GET request.'''
+                if self.path.rstrip('/') not in ('', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(registry.to_dict()).encode(encoding='utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:  # pylint: disable=redefined-builtin
+                '''Requests are not logged to stdout.'''
+
+        try:
+            self._server = ThreadingHTTPServer(('127.0.0.1', port), MetricsHandler)
+        except OSError as ex:
+            print('Failed to serve metrics:', ex)
+            return False
+        Thread(target=self._server.serve_forever,
+               daemon=True).start()
+        return True
+
+    def shutdown(self) -> None:
+        '''Stops serving the metrics.'''
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _NullMetric:
+    '''Accepts everything and does nothing.'''
+
+    def inc(self, amount: int = 1) -> None:
+        '''Does nothing.'''
+
+    def observe(self, value: float) -> None:
+        '''Does nothing.'''
+
+
+class NullRegistry(MetricsRegistry):
+    '''
+    Used while metrics are disabled.
+    Every metric is the same object doing nothing, thus recording costs a single call.
+    Check enabled before measuring something that is expensive to measure.
+    '''
+
+    enabled: bool = False
+    _metric = _NullMetric()
+
+    def counter(self, name: str) -> Counter:
+        return self._metric
+
+    def histogram(self, name: str, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._metric
+
+    def dump(self, file_path: str) -> bool:
+        return False
+
+    def serve(self, port: int) -> bool:
+        return False
+
+
+def get_registry(enabled: bool) -> MetricsRegistry:
+    '''A registry recording metrics or one ignoring them.'''
+    return MetricsRegistry() if enabled else NullRegistry()
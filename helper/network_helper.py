@@ -0,0 +1,378 @@
+'''A single asyncio loop in a background thread that owns every socket.'''
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from enum import IntEnum
+from functools import lru_cache
+from queue import Queue
+from threading import Thread
+from time import monotonic
+from typing import Awaitable, Callable, Coroutine
+
+from helper.discovery_helper import announce
+from helper.protocol_helper import (GAME_MESSAGES, Message, MessageReader,
+                                    MessageType, MessageWriter, ProtocolError,
+                                    encode)
+
+# seconds between two tries to join a game nobody hosts yet, doubled up to the maximum
+JOIN_RETRY = 0.05
+JOIN_RETRY_MAX = 1.0
+# a hosted game tries this many ports from the one asked for, thus several games can host at once
+HOST_PORTS = 10
+# bytes a spectator may fall behind before it is dropped
+SPECTATOR_BUFFER = 64 * 1024
+# game messages kept to resend after reconnecting, a game has at most cols * rows moves
+SENT_MESSAGES = 256
+
+
+class NetworkEvent(IntEnum):
+    '''What happened to a connection, put on the queue of its peer.'''
+    CONNECTED = 0
+    MESSAGE = 1
+    CLOSED = 2
+    # the connection was lost, value is the reason, CONNECTED or CLOSED follows
+    RECONNECTING = 3
+
+
+class NetworkLoop:
+    '''Runs the asyncio loop, everything else talks to it through submit and call.'''
+
+    def __init__(self) -> None:
+        self.loop: asyncio.AbstractEventLoop = asyncio.new_event_loop()
+        Thread(target=self.loop.run_forever,
+               name='network',
+               daemon=True).start()
+
+    def submit(self, coroutine: Coroutine) -> Future:
+        '''Runs the coroutine on the loop, the future can be waited for or canceled.'''
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def call(self, function, *args) -> None:
+        '''Calls the function on the loop as soon as possible.'''
+        self.loop.call_soon_threadsafe(function, *args)
+
+
+@lru_cache(maxsize=None)
+def get_network_loop() -> NetworkLoop:
+    '''The loop is started once and shared by all connections.'''
+    return NetworkLoop()
+
+
+class SpectatorStream:
+    '''
+    Sends the moves of a game to everyone watching it, runs on the loop only.
+    - every move is encoded once, all spectators get the same bytes and sequence numbers
+    - a spectator joining late gets a SYNC of the game so far, then every following MOVE
+    - writing never waits, a spectator whose unsent data grows beyond SPECTATOR_BUFFER is dropped,
+      thus a slow spectator never delays the players
+    - heartbeats keep the sequence number, spectators notice a host gone silent by their absence
+    '''
+
+    def __init__(self, cols: int, rows: int) -> None:
+        self.cols: int = cols
+        self.rows: int = rows
+        self.history: list[int] = []
+        self.dropped: int = 0
+        self._messages: MessageWriter = MessageWriter()
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    def add(self, writer: asyncio.StreamWriter) -> None:
+        '''Sends the game so far, the next MOVE continues its sequence.'''
+        writer.write(encode(Message(type=MessageType.SYNC,
+                                    sequence=self._messages.sequence,
+                                    values=(self.cols, self.rows, len(self.history),
+                                            *self.history))))
+        self._writers.add(writer)
+
+    def remove(self, writer: asyncio.StreamWriter) -> None:
+        '''Stops sending to the spectator.'''
+        self._writers.discard(writer)
+
+    def publish(self, col: int, ply: int) -> None:
+        '''Sends the move to all spectators, ply 0 starts a new game.'''
+        if ply == 0:
+            self.history.clear()
+        self.history.append(col)
+        data = self._messages.write(MessageType.MOVE, col, ply)
+        for writer in list(self._writers):
+            if writer.is_closing() or \
+                    writer.transport.get_write_buffer_size() > SPECTATOR_BUFFER:
+                self.dropped += 1
+                self._writers.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+
+    def heartbeat(self) -> None:
+        '''Tells all spectators the game is still there, without counting as a message.'''
+        data = encode(Message(type=MessageType.HEARTBEAT,
+                              sequence=self._messages.sequence,
+                              values=(False, monotonic())))
+        for writer in list(self._writers):
+            if not writer.is_closing():
+                writer.write(data)
+
+    def close(self) -> None:
+        '''Disconnects all spectators.'''
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+
+class Peer:  # pylint: disable=too-many-instance-attributes
+    '''
+    Connection to the other game.
+    Hosting and joining wait on the loop without polling,
+    everything that happens is put on the events queue as (NetworkEvent, value).
+    A hosted game is announced on the local network (helper/discovery_helper.py).
+    A hosted game can be watched by any number of spectators, they get every move of both players.
+    - a heartbeat is sent every third of the timeout,
+      without any message for the whole timeout the connection counts as lost
+    - a lost connection is restored for up to reconnect seconds, the joining game dials again
+      with a growing delay while the hosting game waits for it
+    - after reconnecting both games send RESUME with the last game message they received,
+      the other one resends everything after it, duplicates are ignored by their sequence
+    - RESIGN ends the connection for good, close sends it
+    Methods can be called from any thread.
+    '''
+
+    def __init__(self, events: Queue, cols: int = 7, rows: int = 6, *,
+                 timeout: float = 5.0, reconnect: float = 30.0) -> None:
+        self.events: Queue = events
+        self.cols: int = cols
+        self.rows: int = rows
+        self.timeout: float = timeout
+        self.reconnect: float = reconnect
+        self.spectators: SpectatorStream = SpectatorStream(cols=cols, rows=rows)
+        self._network: NetworkLoop = get_network_loop()
+        self._task: Future = None
+        self._writer: asyncio.StreamWriter = None
+        self._messages: MessageWriter = MessageWriter()
+        # game messages sent, to resend what the other game missed
+        self._sent: deque[tuple[int, bytes]] = deque(maxlen=SENT_MESSAGES)
+        # sequence of the last game message received
+        self._received: int = 0
+        self._resigned: bool = False
+        # port actually hosted on, None until hosting
+        self.port: int = None
+
+    def host(self, port: int) -> None:
+        '''Waits for the first game to connect on the port, or one of the next if it is taken.'''
+        self._task = self._network.submit(self._host(port))
+
+    def join(self, ip: str, port: int) -> None:
+        '''Connects to the game hosted on ip and port, tries until it is hosted.'''
+        self._task = self._network.submit(self._join(ip, port))
+
+    def spectate(self, ip: str, port: int) -> None:
+        '''Watches the game hosted on ip and port, receives a SYNC and every MOVE after.'''
+        self._task = self._network.submit(self._spectate(ip, port))
+
+    def send(self, message_type: MessageType, *values) -> None:
+        '''Sends the message once connected.'''
+        self._network.call(self._send, message_type, *values)
+
+    def close(self) -> None:
+        '''Resigns and closes the connection, or stops waiting for one.'''
+        if self._task:
+            self._network.call(self._send, MessageType.RESIGN)
+            self._task.cancel()
+            self._task = None
+
+    async def _host(self, port: int) -> None:
+        connections: asyncio.Queue = asyncio.Queue()
+
+        async def on_connection(reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+            '''The first message decides if it is the other player or a spectator.'''
+            messages = MessageReader()
+            received: list[Message] = []
+            try:
+                while not received and (data := await reader.read(4096)):
+                    received = messages.feed(data)
+            except (OSError, ProtocolError):
+                received = []
+            if received and received[0].type == MessageType.SPECTATE:
+                await self._watch(reader, writer)
+            elif received and self._writer is None:
+                # the other player, first or after losing the connection
+                connections.put_nowait((reader, writer, (messages, received)))
+            else:
+                # only one game can play
+                writer.close()
+
+        for self.port in range(port, port + HOST_PORTS):
+            try:
+                server = await asyncio.start_server(on_connection, '0.0.0.0', self.port)
+                break
+            except OSError:
+                # hosted by another game on this computer
+                continue
+        else:
+            self.events.put((NetworkEvent.CLOSED, f'ports {port} to {self.port} are taken'))
+            return
+        beacon = asyncio.create_task(announce(port=self.port, cols=self.cols, rows=self.rows,
+                                              playing=lambda: self._writer is not None))
+        heartbeat = asyncio.create_task(self._send_heartbeats(self.spectators.heartbeat))
+        # keeps accepting spectators and reconnects as long as the game runs
+        try:
+            async with server:
+                await self._connect(connections.get)
+        finally:
+            heartbeat.cancel()
+            beacon.cancel()
+
+    async def _join(self, ip: str, port: int) -> None:
+        async def dial() -> tuple:
+            delay = JOIN_RETRY
+            while True:
+                try:
+                    reader, writer = await asyncio.open_connection(ip, port)
+                    return reader, writer, None
+                except OSError:
+                    # nobody is hosting (yet or again)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, JOIN_RETRY_MAX)
+
+        await self._connect(dial)
+
+    async def _connect(self, get_connection: Callable[[], Awaitable[tuple]]) -> None:
+        '''
+        Plays over the connections until resigned or no connection came back in time.
+        Spectators are disconnected and CLOSED is put in any case, also when closed.
+        '''
+        reason = 'closed'
+        try:
+            reader, writer, pending = await get_connection()
+            self.events.put((NetworkEvent.CONNECTED, None))
+            reason = await self._run(reader, writer, pending)
+            while not self._resigned:
+                self.events.put((NetworkEvent.RECONNECTING, reason))
+                try:
+                    reader, writer, pending = await asyncio.wait_for(get_connection(),
+                                                                     self.reconnect)
+                except asyncio.TimeoutError:
+                    reason = f'no connection within {self.reconnect} seconds'
+                    break
+                self.events.put((NetworkEvent.CONNECTED, None))
+                reason = await self._run(reader, writer, pending)
+        except asyncio.CancelledError:
+            reason = 'resigned'
+            raise
+        finally:
+            self.spectators.close()
+            self.events.put((NetworkEvent.CLOSED, reason))
+
+    async def _watch(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''Spectators only listen, anything they send is ignored until they leave.'''
+        self.spectators.add(writer)
+        try:
+            while await reader.read(4096):
+                continue
+        except OSError:
+            pass
+        finally:
+            self.spectators.remove(writer)
+            writer.close()
+
+    async def _spectate(self, ip: str, port: int) -> None:
+        '''
+        Spectators do not reconnect, they can simply watch again.
+        The host sends heartbeats, without any message for the timeout it counts as gone.
+        '''
+        try:
+            reader, writer = await asyncio.open_connection(ip, port)
+        except OSError as ex:
+            self.events.put((NetworkEvent.CLOSED, str(ex)))
+            return
+        writer.write(self._messages.write(MessageType.SPECTATE))
+        self.events.put((NetworkEvent.CONNECTED, None))
+        messages = MessageReader()
+        reason = 'closed by the other game'
+        try:
+            while data := await asyncio.wait_for(reader.read(4096), self.timeout):
+                for message in messages.feed(data):
+                    if message.type != MessageType.HEARTBEAT:
+                        self.events.put((NetworkEvent.MESSAGE, message))
+        except asyncio.TimeoutError:
+            reason = f'nothing received for {self.timeout} seconds'
+        except (OSError, ProtocolError) as ex:
+            reason = str(ex)
+        finally:
+            writer.close()
+            self.events.put((NetworkEvent.CLOSED, reason))
+
+    def _send(self, message_type: MessageType, *values) -> None:
+        '''Runs on the loop only, thus sequence numbers follow the order of sending.'''
+        data = self._messages.write(message_type, *values)
+        if message_type in GAME_MESSAGES:
+            # also kept while disconnected, it is sent after reconnecting
+            self._sent.append((self._messages.sequence, data))
+            if message_type == MessageType.MOVE:
+                self.spectators.publish(*values)
+        if self._writer is not None and not self._writer.is_closing():
+            self._writer.write(data)
+
+    async def _run(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                   pending: tuple[MessageReader, list[Message]] = None) -> str:
+        '''
+        Reads messages until the connection is lost, returns why.
+        Pending are the reader and messages received before.
+        '''
+        messages, received = pending or (MessageReader(), [])
+        self._writer = writer
+        self._send(MessageType.HANDSHAKE, self.cols, self.rows)
+        self._send(MessageType.RESUME, self._received)
+        heartbeat = asyncio.create_task(self._send_heartbeats(
+            lambda: self._send(MessageType.HEARTBEAT, False, monotonic())))
+        reason = 'closed by the other game'
+        try:
+            for message in received:
+                self._handle(message)
+            while not self._resigned and \
+                    (data := await asyncio.wait_for(reader.read(4096), self.timeout)):
+                for message in messages.feed(data):
+                    self._handle(message)
+        except asyncio.TimeoutError:
+            reason = f'nothing received for {self.timeout} seconds'
+        except (OSError, ProtocolError) as ex:
+            reason = str(ex)
+        except asyncio.CancelledError:
+            self._resigned = True
+            raise
+        finally:
+            heartbeat.cancel()
+            self._writer = None
+            writer.close()
+        if self._resigned:
+            reason = 'resigned'
+        return reason
+
+    async def _send_heartbeats(self, send: Callable[[], None]) -> None:
+        while True:
+            await asyncio.sleep(self.timeout / 3)
+            send()
+
+    def _handle(self, message: Message) -> None:
+        '''Answers protocol messages right away, game messages are passed on once.'''
+        if message.type in GAME_MESSAGES:
+            if message.sequence <= self._received:
+                # resent after reconnecting, but it did arrive before
+                return
+            self._received = message.sequence
+        match message.type:
+            case MessageType.HEARTBEAT if not message.values[0]:
+                self._send(MessageType.HEARTBEAT, True, message.values[1])
+                return
+            case MessageType.RESUME:
+                for sequence, data in self._sent:
+                    if sequence > message.values[0]:
+                        self._writer.write(data)
+                return
+            case MessageType.HANDSHAKE if message.values != (self.cols, self.rows):
+                print('Other game plays on a board of', message.values)
+            case MessageType.MOVE:
+                self.spectators.publish(*message.values)
+            case MessageType.RESIGN:
+                self._resigned = True
+        self.events.put((NetworkEvent.MESSAGE, message))
@@ -0,0 +1,150 @@
+'''Profiles functions of a running game without changing their code.'''
+import sys
+from collections import Counter
+from cProfile import Profile
+from datetime import datetime
+from functools import wraps
+from os import environ, makedirs, path
+from pstats import Stats
+from threading import Event, Lock, Thread, get_ident, local
+from typing import Callable
+
+# set to anything but 0 to profile without touching config.json
+PROFILE_ENV = 'CONNECT_FOUR_PROFILE'
+# seconds between two samples of the profiled threads
+SAMPLE_INTERVAL = 0.005
+
+
+def is_profiling_enabled(setting: bool) -> bool:
+    '''True if the environment variable or the setting asks for profiling.'''
+    return environ.get(PROFILE_ENV, '0') not in ('', '0') or setting
+
+
+def _get_stack(frame) -> str:
+    '''Collapsed stack of the frame, outermost function first.'''
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({path.basename(code.co_filename)}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SessionProfiler:  # pylint: disable=too-many-instance-attributes
+    '''
+    Profiles wrapped functions until the session is saved.
+    - every thread gets its own cProfile, merged into one .pstats file
+    - a background thread samples the stacks of threads inside a wrapped function,
+      written as collapsed stacks (flamegraph.pl, speedscope) to a .collapsed file
+    Nothing is wrapped unless profiling is enabled, thus it costs nothing otherwise.
+    '''
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = directory
+        self.samples: Counter = Counter()
+        self._profiles: list[Profile] = []
+        self._local = local()
+        # thread ident -> how deep it is inside wrapped functions
+        self._active: dict[int, int] = {}
+        self._lock = Lock()
+        self._stopped = Event()
+        self._sampler: Thread = None
+
+    def start(self) -> None:
+        '''Starts sampling, wrapped functions are profiled from now on.'''
+        self._stopped.clear()
+        self._sampler = Thread(target=self._sample,
+                               daemon=True)
+        self._sampler.start()
+
+    def wrap(self, owner: object, name: str) -> None:
+        '''Replaces the function owner.name by a profiled version of it.'''
+        setattr(owner, name, self.profile(getattr(owner, name)))
+
+    def profile(self, function: Callable) -> Callable:
+        '''Returns a profiled version of the function.'''
+        @wraps(function)
+        def profiled(*args, **kwargs):
+            self._enter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._leave()
+        return profiled
+
+    def _enter(self) -> None:
+        ident = get_ident()
+        with self._lock:
+            depth = self._active.get(ident, 0)
+            self._active[ident] = depth + 1
+        if depth:
+            # already profiled by an outer wrapped function
+            return
+        if getattr(self._local, 'unavailable', False):
+            # cProfile failed in this thread before, it is only sampled
+            return
+        profile = getattr(self._local, 'profile', None)
+        created = profile is None
+        if created:
+            profile = Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # newer pythons allow only one active cProfile, this call is only sampled then
+            self._local.unavailable = created
+            return
+        if created:
+            self._local.profile = profile
+            with self._lock:
+                self._profiles.append(profile)
+
+    def _leave(self) -> None:
+        ident = get_ident()
+        with self._lock:
+            depth = self._active.pop(ident) - 1
+            if depth:
+                self._active[ident] = depth
+        profile = getattr(self._local, 'profile', None)
+        if not depth and profile is not None:
+            profile.disable()
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(SAMPLE_INTERVAL):
+            with self._lock:
+                idents = set(self._active)
+            if not idents:
+                continue
+            frames = sys._current_frames()  # pylint: disable=protected-access
+            for ident in idents:
+                if ident in frames:
+                    self.samples[_get_stack(frames[ident])] += 1
+
+    def save(self) -> tuple[str, str] | None:
+        '''Stops profiling and writes the .pstats and .collapsed files, returns their paths.'''
+        self._stopped.set()
+        if self._sampler:
+            self._sampler.join()
+        with self._lock:
+            profiles = list(self._profiles)
+        stats: Stats = None
+        for profile in profiles:
+            try:
+                if stats is None:
+                    stats = Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # the profile never collected anything
+                continue
+        if stats is None and not self.samples:
+            return None
+        makedirs(self.directory, exist_ok=True)
+        session = datetime.now().strftime('%Y%m%d-%H%M%S')
+        stats_path = path.join(self.directory, f'{session}.pstats')
+        collapsed_path = path.join(self.directory, f'{session}.collapsed')
+        if stats is not None:
+            stats.dump_stats(stats_path)
+        with open(file=collapsed_path, mode='w', encoding='utf-8') as file_handle:
+            for stack, count in self.samples.most_common():
+                file_handle.write(f'{stack} {count}\n')
+        return stats_path, collapsed_path
@@ -0,0 +1,143 @@
+'''Binary messages exchanged between two games over the network.'''
+from dataclasses import dataclass
+from enum import IntEnum
+from struct import Struct, error
+
+VERSION = 1
+# version, type, payload length, sequence number
+HEADER = Struct('!BBHI')
+# larger payloads are never sent, anything above is a broken stream
+MAX_PAYLOAD = 1024
+
+
+class MessageType(IntEnum):
+    '''What a message is about, decides how its payload is read.'''
+    HANDSHAKE = 1
+    MOVE = 2
+    HEARTBEAT = 3
+    REMATCH = 4
+    SYNC = 5
+    RESIGN = 6
+    MATCH = 7
+    SPECTATE = 8
+    RESUME = 9
+    ANNOUNCE = 10
+
+
+# fixed size payloads, SYNC is followed by one byte per move
+PAYLOADS: dict[MessageType, Struct] = {
+    # cols, rows
+    MessageType.HANDSHAKE: Struct('!BB'),
+    # col, ply the move was made in
+    MessageType.MOVE: Struct('!BH'),
+    # reply, time of the sender when the first heartbeat was sent
+    MessageType.HEARTBEAT: Struct('!?d'),
+    # accepted, False asks for a rematch or declines one
+    MessageType.REMATCH: Struct('!?'),
+    # cols, rows, number of moves
+    MessageType.SYNC: Struct('!BBH'),
+    MessageType.RESIGN: Struct('!'),
+    # player number within a match started by a server, 1 moves first
+    MessageType.MATCH: Struct('!B'),
+    # sent instead of HANDSHAKE to watch a hosted game
+    MessageType.SPECTATE: Struct('!'),
+    # sequence of the last game message received, sent after every (re)connect
+    MessageType.RESUME: Struct('!I'),
+    # port, cols, rows, playing, broadcast over udp by hosted games
+    MessageType.ANNOUNCE: Struct('!HBB?')
+}
+
+# messages that change the game, resent after reconnecting and recognized by their sequence,
+# which only increases, other messages take numbers of the same sequence in between
+GAME_MESSAGES = (MessageType.MOVE, MessageType.REMATCH, MessageType.SYNC, MessageType.RESIGN)
+
+
+class ProtocolError(Exception):
+    '''Raised for data that is not a message of this protocol version.'''
+
+
+@dataclass(frozen=True)
+class Message:
+    '''A single message, values are the decoded payload.'''
+    type: MessageType
+    sequence: int
+    values: tuple = ()
+
+
+def encode(message: Message) -> bytes:
+    '''Header and payload of the message.'''
+    try:
+        if message.type == MessageType.SYNC:
+            # values are cols, rows, number of moves and the cols of all moves
+            payload = PAYLOADS[message.type].pack(*message.values[:3]) + bytes(message.values[3:])
+        else:
+            payload = PAYLOADS[message.type].pack(*message.values)
+    except (error, ValueError) as ex:
+        raise ProtocolError(f'Can not encode {message}: {ex}') from ex
+    if len(payload) > MAX_PAYLOAD:
+        raise ProtocolError(f'Payload of {message.type.name} is too large: {len(payload)}')
+    return HEADER.pack(VERSION, message.type, len(payload), message.sequence) + payload
+
+
+def _decode_payload(message_type: MessageType, payload: bytes) -> tuple:
+    payload_struct = PAYLOADS[message_type]
+    try:
+        values = payload_struct.unpack_from(payload)
+    except error as ex:
+        raise ProtocolError(f'Broken payload of {message_type.name}: {ex}') from ex
+    rest = payload[payload_struct.size:]
+    if message_type == MessageType.SYNC:
+        if len(rest) != values[2]:
+            raise ProtocolError(f'SYNC announced {values[2]} moves but has {len(rest)}')
+        return values + tuple(rest)
+    if rest:
+        raise ProtocolError(f'{len(rest)} unexpected bytes in {message_type.name}')
+    return values
+
+
+class MessageReader:  # pylint: disable=too-few-public-methods
+    '''
+    Collects received bytes and cuts them into messages.
+    Does not read by itself, thus it works with blocking sockets and asyncio alike.
+    '''
+
+    def __init__(self) -> None:
+        self._buffer: bytearray = bytearray()
+
+    def feed(self, data: bytes) -> list[Message]:
+        '''Adds received bytes and returns every message completed by them.'''
+        self._buffer += data
+        messages = []
+        while len(self._buffer) >= HEADER.size:
+            version, message_type, length, sequence = HEADER.unpack_from(self._buffer)
+            if version != VERSION:
+                raise ProtocolError(f'Protocol version {version} is not supported!')
+            if message_type not in MessageType.__members__.values():
+                raise ProtocolError(f'Message type {message_type} is not supported!')
+            if length > MAX_PAYLOAD:
+                raise ProtocolError(f'Payload of {length} bytes is too large!')
+            end = HEADER.size + length
+            if len(self._buffer) < end:
+                # wait for the rest of the payload
+                break
+            payload = bytes(self._buffer[HEADER.size:end])
+            del self._buffer[:end]
+            message_type = MessageType(message_type)
+            messages.append(Message(type=message_type,
+                                    sequence=sequence,
+                                    values=_decode_payload(message_type, payload)))
+        return messages
+
+
+class MessageWriter:  # pylint: disable=too-few-public-methods
+    '''Numbers outgoing messages, the first message has sequence 1.'''
+
+    def __init__(self) -> None:
+        self.sequence: int = 0
+
+    def write(self, message_type: MessageType, *values) -> bytes:
+        '''Encoded message with the next sequence number.'''
+        self.sequence += 1
+        return encode(Message(type=message_type,
+                              sequence=self.sequence,
+                              values=values))
@@ -0,0 +1,182 @@
+'''A server without a display that hosts many matches at once.'''
+import asyncio
+from collections import deque
+from itertools import count
+
+from engine import GameState
+from helper.metrics_helper import MetricsRegistry, NullRegistry
+from helper.protocol_helper import (Message, MessageReader, MessageType,
+                                    MessageWriter, ProtocolError)
+
+# smallest and largest cols or rows a match can be played on
+MIN_SIZE = 4
+MAX_SIZE = 16
+
+
+class Client:  # pylint: disable=too-few-public-methods
+    '''A connected game, either waiting in the lobby or playing a match.'''
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.writer: asyncio.StreamWriter = writer
+        self.messages: MessageWriter = MessageWriter()
+        # board dimension asked for in the handshake, None until then
+        self.shape: tuple[int, int] = None
+        self.match: Match = None
+        self.player: int = -1
+
+    def send(self, message_type: MessageType, *values) -> None:
+        '''Buffers the message, the loop sends it without blocking.'''
+        if not self.writer.is_closing():
+            self.writer.write(self.messages.write(message_type, *values))
+
+
+class Match:
+    '''Two clients playing on one board, the server's game is the one that counts.'''
+
+    def __init__(self, match_id: int, first: Client, second: Client) -> None:
+        self.match_id: int = match_id
+        self.clients: dict[int, Client] = {1: first, 2: second}
+        cols, rows = first.shape
+        self.game: GameState = GameState(cols=cols, rows=rows)
+        # players that asked for a rematch once the game is over
+        self.rematch: set[int] = set()
+
+    def start(self) -> None:
+        '''Tells both clients which player they are, 1 starts.'''
+        for player, client in self.clients.items():
+            client.match = self
+            client.player = player
+            client.send(MessageType.MATCH, player)
+
+    def get_opponent(self, client: Client) -> Client:
+        '''The other client of the match.'''
+        return self.clients[2 if client.player == 1 else 1]
+
+    def sync(self, client: Client) -> None:
+        '''Sends the whole game, the client replaces its own with it.'''
+        history = self.game.history
+        client.send(MessageType.SYNC, self.game.cols, self.game.rows, len(history), *history)
+
+
+class GameServer:  # pylint: disable=too-few-public-methods
+    '''
+    Pairs clients into matches and checks every move against the engine.
+    - a client sends HANDSHAKE with cols and rows to wait in the lobby for that board
+    - two waiting clients get MATCH with their player number, player 1 moves first
+    - a valid MOVE is sent on to the opponent, an invalid one is answered with SYNC
+    - RESIGN or a lost connection ends the match, the opponent gets RESIGN
+    - once the game is over both can send REMATCH, colors are swapped for the next game
+    - a client sending nothing, not even a HEARTBEAT, for timeout seconds is dropped
+    Runs on one asyncio loop, thus nothing needs a lock.
+    '''
+
+    def __init__(self, metrics: MetricsRegistry = None, timeout: float = 30.0) -> None:
+        self.metrics: MetricsRegistry = metrics or NullRegistry()
+        self.timeout: float = timeout
+        # clients waiting for an opponent by board dimension
+        self.lobby: dict[tuple[int, int], deque[Client]] = {}
+        self.clients: int = 0
+        self.matches: int = 0
+        self._match_ids = count(1)
+
+    async def serve(self, host: str, port: int) -> None:
+        '''Accepts clients until canceled.'''
+        server = await asyncio.start_server(self._on_client, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def _on_client(self, reader: asyncio.StreamReader,
+                         writer: asyncio.StreamWriter) -> None:
+        client = Client(writer)
+        messages = MessageReader()
+        self.clients += 1
+        self.metrics.counter('server_connections').inc()
+        try:
+            while data := await asyncio.wait_for(reader.read(4096), self.timeout):
+                for message in messages.feed(data):
+                    self._handle(client, message)
+        except asyncio.TimeoutError:
+            self.metrics.counter('server_timeouts').inc()
+        except (OSError, ProtocolError) as ex:
+            self.metrics.counter('server_broken_connections').inc()
+            print('Client dropped:', ex)
+        finally:
+            self.clients -= 1
+            self._leave(client)
+            writer.close()
+
+    def _handle(self, client: Client, message: Message) -> None:
+        match message.type:
+            case MessageType.HANDSHAKE:
+                self._join_lobby(client, message.values)
+            case MessageType.MOVE:
+                self._move(client, *message.values)
+            case MessageType.HEARTBEAT if not message.values[0]:
+                client.send(MessageType.HEARTBEAT, True, message.values[1])
+            case MessageType.REMATCH if message.values[0]:
+                self._rematch(client)
+            case MessageType.RESIGN:
+                self._leave(client)
+
+    def _join_lobby(self, client: Client, shape: tuple[int, int]) -> None:
+        if client.match is not None:
+            # a running match has to be resigned first
+            return
+        if not all(MIN_SIZE <= size <= MAX_SIZE for size in shape):
+            self.metrics.counter('server_invalid_handshakes').inc()
+            return
+        if client.shape is not None and client in self.lobby.get(client.shape, ()):
+            self.lobby[client.shape].remove(client)
+        client.shape = shape
+        waiting = self.lobby.setdefault(shape, deque())
+        if not waiting:
+            waiting.append(client)
+            return
+        match = Match(match_id=next(self._match_ids),
+                      first=waiting.popleft(),
+                      second=client)
+        self.matches += 1
+        self.metrics.counter('server_matches').inc()
+        match.start()
+
+    def _move(self, client: Client, col: int, ply: int) -> None:
+        match = client.match
+        if match is None:
+            return
+        game = match.game
+        if game.current_player != client.player or ply != game.board.moves or not game.play(col):
+            # wrong turn, outdated or impossible, the client is behind the server
+            self.metrics.counter('server_invalid_moves').inc()
+            match.sync(client)
+            return
+        self.metrics.counter('server_moves').inc()
+        match.get_opponent(client).send(MessageType.MOVE, col, ply)
+
+    def _rematch(self, client: Client) -> None:
+        match = client.match
+        if match is None or not match.game.is_over():
+            return
+        match.rematch.add(client.player)
+        if len(match.rematch) < 2:
+            return
+        first, second = match.clients[2], match.clients[1]
+        rematch = Match(match_id=next(self._match_ids),
+                        first=first,
+                        second=second)
+        self.matches += 1
+        self.metrics.counter('server_matches').inc()
+        rematch.start()
+
+    def _leave(self, client: Client) -> None:
+        '''Removes the client from the lobby or ends its match.'''
+        if client.shape is not None and client in self.lobby.get(client.shape, ()):
+            self.lobby[client.shape].remove(client)
+        match = client.match
+        if match is None:
+            return
+        opponent = match.get_opponent(client)
+        for player in match.clients.values():
+            player.match = None
+            player.player = -1
+        # also after the game, the opponent waits for a rematch otherwise
+        opponent.send(MessageType.RESIGN)
@@ -0,0 +1,73 @@
+'''Collection of functions to let bots play against each other without a display.'''
+import random
+from math import sqrt
+from statistics import NormalDist
+from time import perf_counter
+
+from engine import Difficulty, GameState, TranspositionTable
+from helper import bot_helper as BotHelper
+
+
+def play_game(index: int, difficulties: tuple[int, int], seed: int,
+              time_budget: float) -> dict:
+    '''
+    Plays one game between both difficulties, the first one starts in every even game.
+    Runs in a worker process, thus it only takes and returns plain values.
+    '''
+    random.seed(seed + index)
+    first, second = difficulties
+    # swap colors every game, the starting player has an advantage
+    players = {1: first, 2: second} if index % 2 == 0 else {1: second, 2: first}
+    transpositions = {1: TranspositionTable(), 2: TranspositionTable()}
+    game = GameState()
+    latencies: list[float] = []
+    while not game.is_over():
+        player = game.current_player
+        start = perf_counter()
+        move = BotHelper.calculate_next_move(difficulty=players[player],
+                                             state=game.board,
+                                             time_budget=time_budget,
+                                             transpositions=transpositions[player])
+        latencies.append(perf_counter() - start)
+        game.play(move)
+    winner = 'draw'
+    if game.winner != -1:
+        winner = 'first' if players[game.winner] == first else 'second'
+    return {
+        'game': index,
+        'first': Difficulty(first).name,
+        'second': Difficulty(second).name,
+        'first_player': 1 if players[1] == first else 2,
+        'winner': winner,
+        'moves': game.history,
+        'latencies': latencies
+    }
+
+
+def get_confidence_interval(count: int, total: int,
+                            confidence: float = 0.95) -> tuple[float, float]:
+    '''Wilson score interval of the rate count / total.'''
+    if total == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = count / total
+    center = (rate + z * z / (2 * total)) / (1 + z * z / total)
+    margin = z * sqrt(rate * (1 - rate) / total + z * z / (4 * total * total)) / (1 + z * z / total)
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def get_summary(results: list[dict], duration: float) -> str:
+    '''Win, draw and loss rates of the first difficulty with their intervals and throughput.'''
+    total = len(results)
+    lines = []
+    for outcome, label in (('first', 'win'), ('draw', 'draw'), ('second', 'loss')):
+        count = len([result for result in results if result['winner'] == outcome])
+        low, high = get_confidence_interval(count, total)
+        rate = count / total if total else 0.0
+        lines.append(f'{label}: {count}/{total} = {rate:.1%} (95% CI {low:.1%} - {high:.1%})')
+    latencies = sorted(latency for result in results for latency in result['latencies'])
+    if latencies:
+        lines.append(f'move latency: median {latencies[len(latencies) // 2] * 1000:.2f} ms, '
+                     f'max {latencies[-1] * 1000:.2f} ms')
+    lines.append(f'throughput: {total / duration:.2f} games/s' if duration > 0 else 'throughput: -')
+    return '\n'.join(lines)
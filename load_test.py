@@ -0,0 +1,24 @@
+'''Simulates many players against a running server.py.'''
+import asyncio
+from argparse import ArgumentParser
+
+from helper.load_test_helper import run_load_test
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Lets N random players play against each other '
+                                        'through a server and reports throughput and latency.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=51231)
+    parser.add_argument('--players', type=int, default=100,
+                        help='even number of players, they are paired by the server')
+    parser.add_argument('--games', type=int, default=10,
+                        help='games each pair plays')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    summary = asyncio.run(run_load_test(host=args.host,
+                                        port=args.port,
+                                        players=args.players,
+                                        games=args.games,
+                                        seed=args.seed))
+    for key, value in summary.items():
+        print(f'{key:<20}{value:.2f}' if isinstance(value, float) else f'{key:<20}{value}')
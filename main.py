@@ -1,8 +1,23 @@
 '''main entry point for the game.'''
-from components import MainWindow, Settings
+from os import getcwd, path
+from tkinter import CallWrapper
+
+from components import GameFrame, MainWindow, Settings
+from helper import bot_helper as BotHelper
+from helper.profiling_helper import SessionProfiler, is_profiling_enabled
 
 if __name__ == '__main__':
     settings = Settings()
     if settings.read():
+        profiler: SessionProfiler = None
+        if is_profiling_enabled(settings.profile):
+            profiler = SessionProfiler(path.join(getcwd(), 'profiles'))
+            profiler.wrap(BotHelper, 'calculate_next_move')
+            profiler.wrap(GameFrame, 'make_move')
+            # every tk callback (commands, bindings, after) passes through here
+            profiler.wrap(CallWrapper, '__call__')
+            profiler.start()
         window = MainWindow(settings)
         window.mainloop()
+        if profiler:
+            print('Profile written to:', profiler.save())
@@ -0,0 +1,26 @@
+'''Hosts matches between any number of games without a display.'''
+import asyncio
+from argparse import ArgumentParser
+
+from helper.metrics_helper import get_registry
+from helper.server_helper import GameServer
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Pairs connecting games into matches.')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=51231)
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help='serves metrics on http://127.0.0.1:<port>/metrics, 0 does not')
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help='seconds a client may send nothing before it is dropped')
+    args = parser.parse_args()
+    metrics = get_registry(enabled=args.metrics_port != 0)
+    metrics.serve(args.metrics_port)
+    print(f'Serving on {args.host}:{args.port}')
+    try:
+        server = GameServer(metrics=metrics, timeout=args.timeout)
+        asyncio.run(server.serve(host=args.host, port=args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        metrics.shutdown()
@@ -0,0 +1,40 @@
+'''Slots and memory of the transposition table.'''
+import unittest
+from itertools import product
+
+from engine import BitBoard, TranspositionTable
+from engine.transposition import WORD_BITS
+
+
+class TestTranspositionTable(unittest.TestCase):
+    '''Keys of the default board and of boards above 64 bits.'''
+
+    def test_center_cols_change_the_slot(self) -> None:
+        '''Positions that only differ in the center cols must not share a slot.'''
+        table = TranspositionTable()
+        slots = set()
+        # the same coins in the outer cols, every order of up to two coins in cols 3 and 4
+        for center in product((None, 3, 4), repeat=4):
+            state = BitBoard(cols=7, rows=6)
+            for col in (0, 1, 0, 1):
+                state.play(col)
+            for col in center:
+                if col is not None:
+                    state.play(col)
+            slots.add((state.key(), table.get_index(state.key())))
+        keys = {key for key, _ in slots}
+        self.assertEqual(len({slot for _, slot in slots}), len(keys))
+
+    def test_memory_cap(self) -> None:
+        '''Keys above 64 bits take fewer entries instead of more memory.'''
+        max_memory = 1024 * 1024
+        table = TranspositionTable(max_memory=max_memory)
+        key = (1 << (WORD_BITS * 3)) | 1
+        table.put(key, 1, 5, 0, 2)
+        self.assertEqual(table.get(key), (1, 5, 0, 2))
+        self.assertIsNone(table.get(1))
+        self.assertLessEqual(table.size * (table.ENTRY_SIZE + 8 * 4), max_memory)
+
+
+if __name__ == '__main__':
+    unittest.main()
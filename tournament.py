@@ -0,0 +1,46 @@
+'''Lets two bots play many games against each other without a display.'''
+import json
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+
+from engine import Difficulty
+from engine.parallel import get_worker_count
+from helper import tournament_helper as TournamentHelper
+
+
+def _parse_difficulty(value: str) -> int:
+    '''Accepts names like extreme or the numbers of the difficulties.'''
+    if value.isdigit():
+        return Difficulty(int(value)).value
+    return Difficulty[value.upper()].value
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Plays N games between two difficulties.')
+    parser.add_argument('first', type=_parse_difficulty,
+                        help='difficulty name or number, e.g. hard')
+    parser.add_argument('second', type=_parse_difficulty)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='processes to play in, 0 uses one per cpu')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time', type=float, default=0.1,
+                        help='seconds the perfect bot may think about a move')
+    parser.add_argument('--output', default='tournament.jsonl',
+                        help='every game is appended as one json line')
+    args = parser.parse_args()
+    results: list[dict] = []
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=get_worker_count(args.workers)) as executor, \
+            open(file=args.output, mode='w', encoding='utf-8') as file_handle:
+        futures = [executor.submit(TournamentHelper.play_game, index,
+                                   (args.first, args.second), args.seed, args.time)
+                   for index in range(0, args.games, 1)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            file_handle.write(json.dumps(result) + '\n')
+            file_handle.flush()
+    print(f'{Difficulty(args.first).name} vs {Difficulty(args.second).name}')
+    print(TournamentHelper.get_summary(results, perf_counter() - start))